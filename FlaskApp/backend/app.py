@@ -18,7 +18,7 @@ def monitor():
     url = data.get('url')
     if not url:
         return jsonify({"error": "URL is required"}), 400
-    result = monitor_endpoints(url)
+    result = monitor_endpoints(url, app.config['MONITOR_CONNECT_TIMEOUT'], app.config['MONITOR_READ_TIMEOUT'])
     return jsonify(result)
 
 @app.route('/outlook_check', methods=['POST'])
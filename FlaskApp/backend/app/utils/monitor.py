@@ -1,11 +1,23 @@
+import os
+import sys
+
 import requests
 
-def monitor_endpoints(url):
+# Share the desktop monitor's connection pool manager rather than keeping a copy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..', 'V4'))
+
+from engine.http_pool import SessionManager
+
+sessions = SessionManager()
+
+def monitor_endpoints(url, connect_timeout=5, read_timeout=10):
     try:
-        response = requests.get(url)
+        response = sessions.get(url, timeout=(connect_timeout, read_timeout))
         if response.status_code == 200:
             return {"status": "success", "message": f"{url} is up"}
         else:
             return {"status": "failure", "message": f"{url} is down"}
+    except requests.exceptions.Timeout as e:
+        return {"status": "timeout", "message": f"{url} timed out: {e}"}
     except requests.exceptions.RequestException as e:
         return {"status": "error", "message": str(e)}
@@ -6,6 +6,10 @@ class Config:
     TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', 'your_twilio_auth_token')
     TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', 'your_twilio_phone_number')
     ALERT_PHONE_NUMBER = os.getenv('ALERT_PHONE_NUMBER', 'your_alert_phone_number')
+
+    # Probe timeouts (seconds)
+    MONITOR_CONNECT_TIMEOUT = float(os.getenv('MONITOR_CONNECT_TIMEOUT', '5'))
+    MONITOR_READ_TIMEOUT = float(os.getenv('MONITOR_READ_TIMEOUT', '10'))
     
     # Outlook configuration
     OUTLOOK_USERNAME = os.getenv('OUTLOOK_USERNAME', 'your_outlook_username')
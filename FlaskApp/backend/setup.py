@@ -1,8 +1,14 @@
+import os
+import sys
 from cx_Freeze import setup, Executable
 
+# engine.http_pool is shared with the desktop monitor in V4
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'V4'))
+
 setup(
     name = "monitoring_app",
     version = "1.0",
     description = "Endpoint Monitoring and Alerting Application",
+    options = {'build_exe': {'packages': ["engine"]}},
     executables = [Executable("app.py")]
 )
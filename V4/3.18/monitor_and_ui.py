@@ -1,17 +1,21 @@
 import os
 import time
 import logging
-import subprocess
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 from logging.handlers import TimedRotatingFileHandler
 import json
+import sys
 from twilio.rest import Client
 from threading import Thread
 import win32com.client
 import pythoncom  # Import pythoncom for COM initialization
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.reachability import check_hosts, open_pinger
+
 # Define logger
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -59,6 +63,10 @@ mail_check_enabled = False
 mail_labels = {}
 evaluation_interval = 300  # Default to 5 minutes
 proxy_settings = {}
+confirm_retries = 1  # Re-checks a failed URL must also fail before alerting
+confirm_delay = 300  # Seconds between confirmation re-checks
+pending_confirmations = {}
+pinger = open_pinger()  # None when unprivileged ICMP isn't allowed; TCP connect is used instead
 
 def send_call_alert(url):
     try:
@@ -72,38 +80,68 @@ def send_call_alert(url):
     except Exception as e:
         logger.error(f"Failed to send call alert: {e}")
 
-def check_url(url):
-    try:
-        response = subprocess.run(['ping', '-n', '1', url], capture_output=True, text=True)
-        if response.returncode == 0:
-            logger.info(f"URL {url} is reachable.")
-            return True
+def check_urls(urls, timeout=5):
+    # ICMP echo in-process instead of spawning ping, every URL in flight at once, or a
+    # TCP connect when ICMP isn't available; accepts bare hosts, host:port or URLs
+    statuses = {}
+    for url, result in check_hosts(pinger, urls, timeout).items():
+        statuses[url] = result['error'] is None
+        if statuses[url]:
+            logger.info(f"URL {url} is reachable in {result['elapsed'] * 1000:.1f} ms ({result['method']}).")
         else:
-            logger.error(f"URL {url} is not reachable.")
-            return False
-    except Exception as e:
-        logger.error(f"Failed to check URL {url}: {e}")
-        return False
+            logger.error(f"URL {url} is not reachable: {result['error']}")
+    return statuses
+
+def check_url(url, timeout=5):
+    return check_urls([url], timeout)[url]
+
+def is_silenced(current_time):
+    return bool(silence_period and silence_period[0] and silence_period[1]
+                and silence_period[0] <= current_time <= silence_period[1])
+
+def confirm_failures(now):
+    # Re-probe URLs whose failure is pending confirmation without holding up the sweep
+    for url, pending in list(pending_confirmations.items()):
+        if now < pending['due']:
+            continue
+        if is_silenced(datetime.utcnow()) or check_url(url):
+            del pending_confirmations[url]
+            logger.info(f"URL {url} recovered before failure was confirmed.")
+            continue
+        pending['remaining'] -= 1
+        if pending['remaining'] > 0:
+            pending['due'] = now + confirm_delay
+        else:
+            del pending_confirmations[url]
+            send_call_alert(url)
 
 def monitor_urls():
+    next_sweep = time.monotonic()
     while True:
         if not monitoring_active:
             break
-        for url in urls_to_monitor:
-            current_time = datetime.utcnow()
-            if silence_period and silence_period[0] <= current_time <= silence_period[1]:
-                status_label.config(text=f"{url}: Monitoring (Silenced)")
-                continue
-
-            status = check_url(url)
-            status_label.config(text=f"{url}: {'Reachable' if status else 'Not Reachable'}")
-
-            if not status:
-                time.sleep(5 * 60)  # 5 minutes
-                if not check_url(url):
-                    send_call_alert(url)
-                    
-        time.sleep(evaluation_interval)
+        now = time.monotonic()
+        if now >= next_sweep:
+            urls = [url for url in urls_to_monitor if url not in pending_confirmations]
+            if is_silenced(datetime.utcnow()):
+                for url in urls:
+                    status_label.config(text=f"{url}: Monitoring (Silenced)")
+                urls = []
+            statuses = check_urls(urls) if urls else {}
+            for url in urls:
+                status = statuses[url]
+                status_label.config(text=f"{url}: {'Reachable' if status else 'Not Reachable'}")
+
+                if not status:
+                    if confirm_retries > 0:
+                        pending_confirmations[url] = {'remaining': confirm_retries, 'due': now + confirm_delay}
+                    else:
+                        send_call_alert(url)
+            next_sweep = now + evaluation_interval
+
+        confirm_failures(time.monotonic())
+        wake = min([next_sweep] + [p['due'] for p in pending_confirmations.values()])
+        time.sleep(max(0, wake - time.monotonic()))
 
 def start_monitoring():
     global monitoring_thread
@@ -156,7 +194,7 @@ def start_mail_monitoring():
     app_logger.info("Mailbox monitoring started.")
 
 def save_and_start_monitoring():
-    global twilio_client, mail_check_enabled, mail_labels, evaluation_interval, proxy_settings
+    global twilio_client, mail_check_enabled, mail_labels, evaluation_interval, proxy_settings, confirm_retries, confirm_delay
     twilio_details['account_sid'] = account_sid_entry.get()
     twilio_details['auth_token'] = auth_token_entry.get()
     twilio_details['twilio_number'] = twilio_number_entry.get()
@@ -167,6 +205,8 @@ def save_and_start_monitoring():
 
     urls = urls_entry.get().split(',')
     evaluation_interval = int(evaluation_interval_entry.get()) * 60  # Convert minutes to seconds
+    confirm_retries = int(confirm_retries_entry.get())
+    confirm_delay = int(confirm_delay_entry.get()) * 60
 
     proxy_settings['http_proxy'] = http_proxy_entry.get()
     proxy_settings['https_proxy'] = https_proxy_entry.get()
@@ -204,6 +244,8 @@ def save_configuration():
         'twilio_details': twilio_details,
         'urls_to_monitor': urls_to_monitor,
         'evaluation_interval': evaluation_interval,
+        'confirm_retries': confirm_retries,
+        'confirm_delay': confirm_delay,
         'proxy_settings': proxy_settings,
         'mail_check_enabled': mail_check_enabled,
         'mail_labels': mail_labels,
@@ -224,6 +266,9 @@ def load_configuration():
             urls_to_monitor.extend(config.get('urls_to_monitor', []))
             global evaluation_interval
             evaluation_interval = config.get('evaluation_interval', 300)
+            global confirm_retries, confirm_delay
+            confirm_retries = config.get('confirm_retries', 1)
+            confirm_delay = config.get('confirm_delay', 300)
             proxy_settings.update(config.get('proxy_settings', {}))
             global mail_check_enabled
             mail_check_enabled = config.get('mail_check_enabled', False)
@@ -349,6 +394,16 @@ evaluation_interval_entry = ttk.Entry(eval_frame)
 evaluation_interval_entry.insert(0, str(evaluation_interval // 60))
 evaluation_interval_entry.pack()
 
+ttk.Label(eval_frame, text="Failure Confirmation Retries").pack()
+confirm_retries_entry = ttk.Entry(eval_frame)
+confirm_retries_entry.insert(0, str(confirm_retries))
+confirm_retries_entry.pack()
+
+ttk.Label(eval_frame, text="Confirmation Delay (minutes)").pack()
+confirm_delay_entry = ttk.Entry(eval_frame)
+confirm_delay_entry.insert(0, str(confirm_delay // 60))
+confirm_delay_entry.pack()
+
 # Function to save configuration
 def on_save_configuration():
     save_configuration()
@@ -375,6 +430,10 @@ def on_load_configuration():
     http_proxy_entry.insert(0, proxy_settings.get('http_proxy', ''))
     https_proxy_entry.delete(0, tk.END)
     https_proxy_entry.insert(0, proxy_settings.get('https_proxy', ''))
+    confirm_retries_entry.delete(0, tk.END)
+    confirm_retries_entry.insert(0, str(confirm_retries))
+    confirm_delay_entry.delete(0, tk.END)
+    confirm_delay_entry.insert(0, str(confirm_delay // 60))
     
     mail_check_var.set(1 if mail_check_enabled else 0)
     mail_labels_entry.delete(0, tk.END)
@@ -1,3 +1,4 @@
+import os
 import sys
 from cx_Freeze import setup, Executable
 
@@ -5,9 +6,12 @@ base = "Win32GUI" if sys.platform == "win32" else None
 
 executables = [Executable("monitor_and_ui.py", base=base)]
 
+# The shared probe helpers live in the engine package one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 packages = [
     "os", "sys", "time", "logging", "subprocess", "tkinter", 
-    "datetime", "json", "twilio", "threading", "win32com.client"
+    "datetime", "json", "twilio", "threading", "win32com.client", "engine"
 ]
 
 options = {
@@ -1,16 +1,21 @@
 import os
+import sys
 import time
 import logging
-import subprocess
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from logging.handlers import TimedRotatingFileHandler
 import json
-import re
+import requests
 from twilio.rest import Client
 from threading import Thread
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.body_match import DEFAULT_MAX_BODY_BYTES, stream_search
+from engine.reachability import check_host, open_pinger
+
 # Define logger
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -43,6 +48,11 @@ evaluation_interval = 300  # Default to 5 minutes
 proxy_settings = {}
 regex_patterns = {}
 alert_threads = {}
+twilio_clients = {}  # account name -> ((sid, token), Client)
+http_session = requests.Session()
+probe_timeout = (5, 10)  # Seconds to connect, seconds to wait for each read
+max_body_bytes = DEFAULT_MAX_BODY_BYTES  # Most of a page read when matching a regex
+pinger = open_pinger()  # None when unprivileged ICMP isn't allowed; TCP connect is used instead
 
 # Helper functions
 def load_data():
@@ -69,13 +79,21 @@ def save_data():
     with open('monitor_config.json', 'w') as f:
         json.dump(config, f)
 
+def get_twilio_client(account_name, account):
+    # Reuse one client (and its HTTP connections) per account until its credentials change
+    credentials = (account['account_sid'], account['auth_token'])
+    cached = twilio_clients.get(account_name)
+    if not cached or cached[0] != credentials:
+        cached = twilio_clients[account_name] = (credentials, Client(*credentials))
+    return cached[1]
+
 def send_alert(alert_type, url, message, account_name):
     try:
         account = twilio_accounts.get(account_name)
         if not account:
             raise ValueError("Twilio account not found")
         
-        client = Client(account['account_sid'], account['auth_token'])
+        client = get_twilio_client(account_name, account)
         for number in account['recipient_numbers']:
             if alert_type == 'call':
                 call = client.calls.create(
@@ -98,58 +116,60 @@ def send_alert(alert_type, url, message, account_name):
         logger.error(f"Failed to send {alert_type} alert: {e}")
 
 def check_url(url, regex=None):
+    # One in-process request: HEAD when only the status is needed, GET when the body is matched.
+    # The body is streamed and searched chunk by chunk, stopping at the first match or max_body_bytes.
     try:
-        response = subprocess.run(['curl', '-I', url], capture_output=True, text=True)
-        status_code = response.stdout.split()[1]
-        if response.returncode == 0:
-            logger.info(f"URL {url} is reachable with status code {status_code}.")
-            if regex:
-                page_content = subprocess.run(['curl', url], capture_output=True, text=True).stdout
-                if re.search(regex, page_content):
-                    logger.info(f"Regex {regex} matched for URL {url}.")
-                    return status_code, True
-                else:
-                    logger.error(f"Regex {regex} did not match for URL {url}.")
-                    return status_code, False
-            return status_code, True
+        if not regex:
+            response = http_session.head(url, allow_redirects=False, timeout=probe_timeout)
+            response.close()
         else:
-            logger.error(f"URL {url} is not reachable with status code {status_code}.")
-            return status_code, False
+            response = http_session.get(url, allow_redirects=False, timeout=probe_timeout, stream=True)
+        status_code = str(response.status_code)
+        logger.info(f"URL {url} is reachable with status code {status_code}.")
+        if regex:
+            if stream_search(response, regex, max_body_bytes)['matched']:
+                logger.info(f"Regex {regex} matched for URL {url}.")
+                return status_code, True
+            else:
+                logger.error(f"Regex {regex} did not match for URL {url}.")
+                return status_code, False
+        return status_code, True
+    except requests.Timeout as e:
+        logger.error(f"URL {url} timed out: {e}")
+        return None, False
+    except requests.RequestException as e:
+        logger.error(f"URL {url} is not reachable: {e}")
+        return None, False
     except Exception as e:
         logger.error(f"Failed to check URL {url}: {e}")
         return None, False
 
-def check_intranet_url(url):
-    try:
-        response = subprocess.run(
-            ['ping', '-n', '1', url],
-            capture_output=True,
-            text=True,
-            env={**os.environ, 'http_proxy': proxy_settings.get('http_proxy', ''), 'https_proxy': proxy_settings.get('https_proxy', '')}
-        )
-        if response.returncode == 0:
-            logger.info(f"Intranet URL {url} is reachable.")
-            return True
-        else:
-            logger.error(f"Intranet URL {url} is not reachable.")
-            return False
-    except Exception as e:
-        logger.error(f"Failed to check intranet URL {url}: {e}")
-        return False
+def check_intranet_url(url, timeout=5, port=None):
+    # ICMP echo in-process instead of spawning ping, or a TCP connect to `port` when ICMP
+    # isn't available; accepts a bare host, host:port or a URL
+    result = check_host(pinger, url, timeout, port)
+    if result['error'] is None:
+        logger.info(f"Intranet URL {url} is reachable in {result['elapsed'] * 1000:.1f} ms ({result['method']}).")
+        return True
+    logger.error(f"Intranet URL {url} is not reachable: {result['error']}")
+    return False
 
 def monitor_url(alert):
     while monitoring_active:
         current_time = datetime.utcnow()
         if silence_period and silence_period[0] <= current_time <= silence_period[1]:
+            # Sleep through the silence instead of spinning; wake at its end
+            time.sleep((silence_period[1] - current_time).total_seconds())
             continue
 
         job = monitoring_jobs.get(alert['job_name'])
         if not job:
+            time.sleep(alert['scrape_interval'])
             continue
         
         url = job['url']
         regex = job.get('regex')
-        status_code, status = check_url(url, regex) if job['url_type'] == 'internet' else (None, check_intranet_url(url))
+        status_code, status = check_url(url, regex) if job['url_type'] == 'internet' else (None, check_intranet_url(url, port=job.get('port')))
         if status:
             for code in alert['response_codes']:
                 if str(status_code) == code:
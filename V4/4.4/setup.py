@@ -1,3 +1,4 @@
+import os
 import sys
 from cx_Freeze import setup, Executable
 
@@ -7,10 +8,14 @@ base = "Win32GUI" if sys.platform == "win32" else None
 # Define the main application executable
 executables = [Executable("monitoring_and_ui.py", base=base)]
 
+# The shared probe helpers live in the engine package one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Additional packages required by the application
 packages = [
     "os", "sys", "time", "logging", "subprocess", "tkinter", 
-    "datetime", "json", "twilio", "threading", "win32com.client", "re"
+    "datetime", "json", "twilio", "threading", "win32com.client", "re",
+    "requests", "engine"
 ]
 
 # Define build options
@@ -0,0 +1,94 @@
+import argparse
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.http_check import check_http
+from engine.http_pool import SessionManager
+
+BODY = b"<html><body>" + b"x" * 4096 + b"status: OK</body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle stall keep-alive clients
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _headers(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        self._headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# The curl path exactly as check_url ran it before: one process for the status
+# line and, when a regex is set, a second one for the body.
+def subprocess_check(url, regex=None):
+    response = subprocess.run(['curl', '-sI', url], capture_output=True, text=True)
+    status_code = response.stdout.split()[1]
+    if regex:
+        page_content = subprocess.run(['curl', '-s', url], capture_output=True, text=True).stdout
+        return status_code, re.search(regex, page_content) is not None
+    return status_code, True
+
+
+def in_process_check(sessions, url, regex=None):
+    result = check_http(sessions, url, regex)
+    return result['status_code'], result['matched'] is not False
+
+
+def rate(label, count, func):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {count / elapsed:10.1f} checks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare curl subprocess checks against in-process checks.")
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--regex', default='status: OK')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    sessions = SessionManager()
+
+    try:
+        if shutil.which('curl'):
+            rate("subprocess curl (status)", args.count, lambda: subprocess_check(url))
+            rate("subprocess curl (regex)", args.count, lambda: subprocess_check(url, args.regex))
+        else:
+            print("curl not found; skipping subprocess baseline")
+        rate("in-process HEAD (status)", args.count, lambda: in_process_check(sessions, url))
+        rate("in-process GET (regex)", args.count, lambda: in_process_check(sessions, url, args.regex))
+    finally:
+        sessions.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.records import Alert, Job
+
+
+def job_dict(n):
+    return {
+        'url': f"https://service{n}.example.com/health",
+        'url_type': 'text',
+        'regex': '',
+        'proxy': '',
+    }
+
+
+def alert_dict(n):
+    return {
+        'alert_name': f"alert{n}",
+        'job_name': f"job{n}",
+        'twilio_account': 'ops',
+        'scrape_interval': 300,
+        'response_codes': ['200', '301'],
+        'send_recovery': True,
+        'monitoring': True,
+    }
+
+
+# Both representations are loaded from the same config.json text, as the app does
+def config_text(count):
+    return json.dumps({
+        'monitoring_jobs': {f"job{n}": job_dict(n) for n in range(count)},
+        'alerts': [alert_dict(n) for n in range(count)],
+    })
+
+
+def as_dicts(text):
+    data = json.loads(text)
+    return data['monitoring_jobs'], data['alerts']
+
+
+def as_records(text):
+    data = json.loads(text)
+    jobs = {name: Job.from_dict(job) for name, job in data.pop('monitoring_jobs').items()}
+    alerts = [Alert.from_dict(alert) for alert in data.pop('alerts')]
+    return jobs, alerts
+
+
+def measure(label, text, count, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(text)
+    elapsed = time.perf_counter() - start
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} {size / 2 ** 20:8.1f} MiB ({peak / 2 ** 20:.1f} MiB peak) "
+          f"{size / count:6.0f} B/job+alert {elapsed:6.2f}s to load")
+    return data
+
+
+# Status-code check as monitor_alert did it on every probe, against the
+# pre-parsed codes the records carry
+def status_checks(label, alerts, check):
+    start = time.perf_counter()
+    for alert in alerts:
+        check(alert, 200)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {len(alerts) / elapsed:12.0f} checks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory use of dict configs against __slots__ records.")
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    text = config_text(args.count)
+    _, dict_alerts = measure("dicts", text, args.count, as_dicts)
+    _, record_alerts = measure("slots records", text, args.count, as_records)
+    status_checks("dicts", dict_alerts, lambda alert, code: code in [int(c) for c in alert['response_codes']])
+    status_checks("slots records", record_alerts, lambda alert, code: code in alert.status_codes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import statistics
+import threading
+from collections import deque
+
+
+# Adaptive probe intervals for alerts that set min_interval / max_interval
+# (seconds). Any failure drops the interval straight to the minimum. A run of
+# successes with steady latency (coefficient of variation below
+# `max_variation`) and no failure in the last `window` probes grows it by
+# `growth` up to the maximum; noisy latency shrinks it back towards the
+# minimum. When the combined rate of all alerts would exceed
+# `max_probes_per_second`, adaptive intervals are stretched proportionally,
+# so the budget wins over max_interval.
+class AdaptiveIntervals:
+    def __init__(self, max_probes_per_second=None, window=20, growth=1.5, max_variation=0.5):
+        self.max_probes_per_second = max_probes_per_second
+        self.window = window
+        self.growth = growth
+        self.max_variation = max_variation
+        self._states = {}
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    # Returns seconds until the alert's next probe, or None to keep its fixed
+    # scrape_interval
+    def next_interval(self, alert, ok, elapsed=None):
+        name = alert['alert_name']
+        min_interval = alert.get('min_interval')
+        max_interval = alert.get('max_interval')
+        with self._lock:
+            if not (min_interval and max_interval):
+                self._rates[name] = 1 / (alert['scrape_interval'] or 1)
+                return None
+
+            state = self._states.setdefault(name, {
+                'interval': alert['scrape_interval'] or min_interval,
+                'outcomes': deque(maxlen=self.window),
+                'latencies': deque(maxlen=self.window),
+            })
+            state['outcomes'].append(ok)
+            if not ok:
+                interval = min_interval
+            else:
+                if elapsed is not None:
+                    state['latencies'].append(elapsed)
+                interval = state['interval']
+                if self._steady(state):
+                    interval *= self.growth
+                elif len(state['latencies']) >= 2:
+                    interval /= self.growth
+            interval = min(max_interval, max(min_interval, interval))
+            state['interval'] = interval
+            self._rates[name] = 1 / interval
+
+            total = sum(self._rates.values())
+            if self.max_probes_per_second and total > self.max_probes_per_second:
+                interval *= total / self.max_probes_per_second
+            return interval
+
+    def _steady(self, state):
+        if not all(state['outcomes']):
+            return False
+        latencies = state['latencies']
+        if len(latencies) < 2:
+            return True
+        mean = statistics.fmean(latencies)
+        return not mean or statistics.pstdev(latencies) / mean < self.max_variation
+
+    def forget(self, alert_name):
+        with self._lock:
+            self._states.pop(alert_name, None)
+            self._rates.pop(alert_name, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'probes_per_second': sum(self._rates.values()),
+                'intervals': {name: state['interval'] for name, state in self._states.items()},
+            }
@@ -0,0 +1,97 @@
+import threading
+
+
+# Alerts indexed by alert_name, with secondary indexes by job_name and
+# twilio_account, so lookups cost O(1) and "which alerts use job X" costs
+# O(result) instead of a scan over every alert. Iterates in insertion order
+# like the plain list it replaces. Adding an alert whose name already exists
+# replaces it.
+class AlertRegistry:
+    def __init__(self, alerts=()):
+        self._by_name = {}
+        self._by_job = {}
+        self._by_account = {}
+        self._owned = None  # For a copy, the (index, key) buckets it has made its own; None owns all
+        self._lock = threading.RLock()
+        self.replace(alerts)
+
+    # A registry holding the same alerts that shares this one's index buckets
+    # until it changes them, so deriving one from another costs three flat
+    # dict copies plus O(changes) rather than re-indexing every alert. This
+    # registry is not affected by changes to the copy.
+    def copy(self):
+        with self._lock:
+            registry = AlertRegistry()
+            registry._by_name = self._by_name.copy()
+            registry._by_job = self._by_job.copy()
+            registry._by_account = self._by_account.copy()
+            registry._owned = set()
+            return registry
+
+    def replace(self, alerts):
+        with self._lock:
+            self._by_name.clear()
+            self._by_job.clear()
+            self._by_account.clear()
+            self._owned = None
+            for alert in alerts:
+                self.add(alert)
+
+    def add(self, alert):
+        with self._lock:
+            self.remove(alert['alert_name'])
+            self._by_name[alert['alert_name']] = alert
+            self._bucket('job', alert['job_name'], True)[alert['alert_name']] = alert
+            self._bucket('account', alert['twilio_account'], True)[alert['alert_name']] = alert
+
+    def remove(self, alert_name):
+        with self._lock:
+            alert = self._by_name.pop(alert_name, None)
+            if alert is not None:
+                self._unindex('job', alert['job_name'], alert_name)
+                self._unindex('account', alert['twilio_account'], alert_name)
+            return alert
+
+    # The bucket for `key` in an index, copied first if it's still shared
+    def _bucket(self, index_name, key, create=False):
+        index = self._by_job if index_name == 'job' else self._by_account
+        bucket = index.get(key)
+        if bucket is None:
+            if not create:
+                return None
+            bucket = index[key] = {}
+        elif self._owned is None or (index_name, key) in self._owned:
+            return bucket
+        else:
+            bucket = index[key] = dict(bucket)
+        if self._owned is not None:
+            self._owned.add((index_name, key))
+        return bucket
+
+    def _unindex(self, index_name, key, alert_name):
+        bucket = self._bucket(index_name, key)
+        if bucket is not None:
+            bucket.pop(alert_name, None)
+            if not bucket:
+                del (self._by_job if index_name == 'job' else self._by_account)[key]
+
+    def get(self, alert_name):
+        return self._by_name.get(alert_name)
+
+    def by_job(self, job_name):
+        with self._lock:
+            return list(self._by_job.get(job_name, {}).values())
+
+    def by_account(self, account_name):
+        with self._lock:
+            return list(self._by_account.get(account_name, {}).values())
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_name.values()))
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __contains__(self, alert_name):
+        return alert_name in self._by_name
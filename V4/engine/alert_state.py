@@ -0,0 +1,75 @@
+import threading
+import time
+
+OK = 'OK'
+PENDING = 'PENDING'
+FIRING = 'FIRING'
+RESOLVED = 'RESOLVED'
+
+DEFAULT_FAIL_THRESHOLD = 2
+DEFAULT_RECOVER_THRESHOLD = 2
+DEFAULT_RENOTIFY_INTERVAL = 3600
+
+
+# Per-alert OK -> PENDING -> FIRING -> RESOLVED state machine. observe() is fed
+# every probe outcome and returns what to send, if anything:
+#   'fire'     - fail_threshold consecutive failures reached
+#   'renotify' - still failing and renotify_interval has passed (0 disables)
+#   'resolve'  - recover_threshold consecutive successes while firing
+# so a long outage produces one notification plus periodic reminders rather
+# than one per probe. Thresholds and interval are read from the alert dict.
+class AlertStateMachine:
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def observe(self, alert, ok, now=None):
+        now = now or time.time()
+        fail_threshold = alert.get('fail_threshold') or DEFAULT_FAIL_THRESHOLD
+        recover_threshold = alert.get('recover_threshold') or DEFAULT_RECOVER_THRESHOLD
+        renotify_interval = alert.get('renotify_interval', DEFAULT_RENOTIFY_INTERVAL)
+
+        with self._lock:
+            state = self._states.setdefault(alert['alert_name'], {
+                'state': OK, 'failures': 0, 'successes': 0, 'since': now, 'last_notified': None})
+            if state['state'] == RESOLVED:
+                self._move(state, OK, now)
+
+            if ok:
+                state['failures'] = 0
+                state['successes'] += 1
+                if state['state'] == PENDING:
+                    self._move(state, OK, now)
+                elif state['state'] == FIRING and state['successes'] >= recover_threshold:
+                    self._move(state, RESOLVED, now)
+                    return 'resolve'
+                return None
+
+            state['successes'] = 0
+            state['failures'] += 1
+            if state['state'] == FIRING:
+                if renotify_interval and now - state['last_notified'] >= renotify_interval:
+                    state['last_notified'] = now
+                    return 'renotify'
+                return None
+            if state['failures'] >= fail_threshold:
+                self._move(state, FIRING, now)
+                state['last_notified'] = now
+                return 'fire'
+            if state['state'] == OK:
+                self._move(state, PENDING, now)
+            return None
+
+    @staticmethod
+    def _move(state, new_state, now):
+        state['state'] = new_state
+        state['since'] = now
+
+    def state(self, alert_name):
+        with self._lock:
+            state = self._states.get(alert_name)
+            return dict(state) if state else {'state': OK}
+
+    def reset(self, alert_name):
+        with self._lock:
+            self._states.pop(alert_name, None)
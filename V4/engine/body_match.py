@@ -0,0 +1,55 @@
+import codecs
+import re
+import time
+
+from .timeouts import ProbeTimeout
+
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 16 * 1024
+DEFAULT_OVERLAP = 4096
+
+
+def _decoder(encoding):
+    try:
+        return codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+# Searches a streamed response body for a regex without holding the whole page
+# in memory. Each chunk is searched together with the tail of the previous
+# text so matches spanning a chunk boundary are still found, as long as the
+# match is no longer than overlap characters. Downloading stops on the first
+# match, once max_bytes have been read, or with ProbeTimeout once the
+# perf_counter() deadline passes.
+def stream_search(response, regex, max_bytes=DEFAULT_MAX_BODY_BYTES,
+                  chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_OVERLAP, deadline=None):
+    pattern = re.compile(regex) if isinstance(regex, str) else regex
+    decoder = _decoder(response.encoding)
+    tail = ''
+    read = 0
+    result = {'matched': False, 'bytes_read': 0, 'truncated': False}
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if deadline is not None and time.perf_counter() > deadline:
+                raise ProbeTimeout(f"Body not matched within deadline after {read} bytes")
+            if max_bytes and read + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - read]
+                result['truncated'] = True
+            read += len(chunk)
+            window = tail + decoder.decode(chunk, final=result['truncated'])
+            if pattern.search(window):
+                result['matched'] = True
+                break
+            tail = window[-overlap:]
+            if result['truncated']:
+                break
+        else:
+            if pattern.search(tail + decoder.decode(b'', final=True)):
+                result['matched'] = True
+    finally:
+        response.close()
+
+    result['bytes_read'] = read
+    return result
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+
+from .reachability import parse_target
+
+CLOSED = 'CLOSED'
+OPEN = 'OPEN'
+HALF_OPEN = 'HALF_OPEN'
+
+
+# Breakers are shared by every job that reaches the same host through the
+# same proxy, since those all fail together when the host is hard-down.
+def breaker_key(url, proxy=''):
+    host, port = parse_target(url)
+    return f"{host.lower()}:{port}" + (f" via {proxy}" if proxy else '')
+
+
+# Per-host circuit breakers around probe calls. A breaker opens after
+# `threshold` consecutive probes fail at the connection level (errors and
+# timeouts; HTTP status codes don't count, the host answered). While open,
+# one sampling probe is let through every `sample_interval` seconds and every
+# other call gets the last failed result back, marked short_circuited, without
+# touching the network. A successful sample closes the breaker; a failed one
+# keeps it open for another interval.
+class CircuitBreakers:
+    def __init__(self, threshold=3, sample_interval=60):
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, probe):
+        now = time.monotonic()
+        with self._lock:
+            breaker = self._breakers.setdefault(key, {
+                'state': CLOSED, 'failures': 0, 'opened_at': None, 'next_sample': 0.0,
+                'short_circuited': 0, 'last_result': None})
+            if breaker['state'] != CLOSED:
+                if breaker['state'] == HALF_OPEN or now < breaker['next_sample']:
+                    breaker['short_circuited'] += 1
+                    return breaker['last_result'].copy(elapsed=0.0, short_circuited=True)
+                breaker['state'] = HALF_OPEN
+
+        try:
+            result = probe()
+        except Exception:
+            # Don't leave a half-open breaker waiting on a sample that never finished
+            with self._lock:
+                if breaker['state'] == HALF_OPEN:
+                    breaker['state'] = OPEN
+                    breaker['next_sample'] = time.monotonic() + self.sample_interval
+            raise
+
+        with self._lock:
+            previous = breaker['state']
+            if result['error'] is None:
+                breaker.update(state=CLOSED, failures=0, opened_at=None, last_result=None)
+            else:
+                breaker['failures'] += 1
+                breaker['last_result'] = result
+                if previous == HALF_OPEN or breaker['failures'] >= self.threshold:
+                    breaker['state'] = OPEN
+                    breaker['next_sample'] = time.monotonic() + self.sample_interval
+                    if previous == CLOSED:
+                        breaker['opened_at'] = time.time()
+            failures = breaker['failures']
+            state = breaker['state']
+        if previous == CLOSED and state == OPEN:
+            logging.warning(f"Circuit for {key} opened after {failures} failed probes")
+        elif previous != CLOSED and state == CLOSED:
+            logging.info(f"Circuit for {key} closed")
+        return result
+
+    def state(self, key):
+        with self._lock:
+            breaker = self._breakers.get(key)
+            return breaker['state'] if breaker else CLOSED
+
+    def reset(self, key):
+        with self._lock:
+            self._breakers.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: {
+                    'state': breaker['state'],
+                    'failures': breaker['failures'],
+                    'opened_at': breaker['opened_at'],
+                    'next_sample_in': max(0.0, breaker['next_sample'] - time.monotonic())
+                                      if breaker['state'] != CLOSED else None,
+                    'short_circuited': breaker['short_circuited'],
+                }
+                for key, breaker in self._breakers.items()
+            }
@@ -0,0 +1,105 @@
+import threading
+from types import MappingProxyType
+
+from .alert_registry import AlertRegistry
+
+
+# One published version of the configuration. Nothing in a snapshot is
+# changed after it is published: the UI edits its own working copy, replacing
+# records rather than mutating them, and publishes a new snapshot.
+class ConfigSnapshot:
+    __slots__ = ('version', 'accounts', 'jobs', 'alerts')
+
+    def __init__(self, version=0, accounts=None, jobs=None, alerts=()):
+        self.version = version
+        self.accounts = MappingProxyType(dict(accounts or {}))
+        self.jobs = MappingProxyType(dict(jobs or {}))
+        self.alerts = AlertRegistry(alerts)
+
+    # The next version from the previous one plus the names edited in each
+    # section, read from the working copies. The new version starts as flat
+    # copies of the old one's mappings, sharing every record and alert index
+    # bucket, and only the edited names are applied and diffed. Returns the
+    # snapshot and its changes in diff()'s layout.
+    @classmethod
+    def derive(cls, old, accounts, jobs, alerts, changed):
+        new = cls.__new__(cls)
+        new.version = old.version + 1
+        changes = {}
+        for section, current, source in (('accounts', old.accounts, accounts), ('jobs', old.jobs, jobs)):
+            patched = current.copy()
+            changes[section] = _patch(current, source, changed.get(section, ()), patched.__setitem__, patched.pop)
+            setattr(new, section, MappingProxyType(patched))
+        new.alerts = old.alerts.copy()
+        changes['alerts'] = _patch(old.alerts, alerts, changed.get('alerts', ()),
+                                   lambda name, alert: new.alerts.add(alert), new.alerts.remove)
+        return new, changes
+
+
+# Puts each named entry of `source` with put(name, value), or drop(name)s it
+# when source no longer has it, and reports what that changed from `current`
+def _patch(current, source, names, put, drop):
+    changes = {'added': [], 'removed': [], 'changed': []}
+    for name in dict.fromkeys(names):
+        old_value, value = current.get(name), source.get(name)
+        if value is None:
+            if old_value is not None:
+                drop(name)
+                changes['removed'].append(name)
+        elif old_value is None:
+            put(name, value)
+            changes['added'].append(name)
+        elif old_value is not value:
+            put(name, value)
+            changes['changed'].append(name)
+    return changes
+
+
+def _diff(old, new):
+    return {
+        'added': [name for name in new if name not in old],
+        'removed': [name for name in old if name not in new],
+        'changed': [name for name, value in new.items() if name in old and old[name] is not value],
+    }
+
+
+# Per-section lists of added, removed and changed names between two snapshots.
+# Records are replaced on every edit, so identity tells what changed.
+def diff(old, new):
+    return {
+        'accounts': _diff(old.accounts, new.accounts),
+        'jobs': _diff(old.jobs, new.jobs),
+        'alerts': _diff({alert['alert_name']: alert for alert in old.alerts},
+                        {alert['alert_name']: alert for alert in new.alerts}),
+    }
+
+
+# Holds the current snapshot. Readers take `versions.current` once and use it
+# without locking; publish() builds the next version, swaps it in with a
+# single assignment and hands (old, new, changes) to each subscriber so the
+# engine can act on just what changed. Callers that know which names they
+# edited pass them as `changed` ({'accounts': [...], 'jobs': [...],
+# 'alerts': [...]}) and the version is derived from the previous one (see
+# ConfigSnapshot.derive); without it every record is re-indexed and diffed,
+# as a reload needs.
+class ConfigVersions:
+    def __init__(self):
+        self.current = ConfigSnapshot()
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, accounts, jobs, alerts, changed=None):
+        with self._lock:
+            old = self.current
+            if changed is None:
+                new = ConfigSnapshot(old.version + 1, accounts, jobs, alerts)
+                changes = diff(old, new)
+            else:
+                new, changes = ConfigSnapshot.derive(old, accounts, jobs, alerts, changed)
+            self.current = new
+            for callback in self._subscribers:
+                callback(old, new, changes)
+        return new
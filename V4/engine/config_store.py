@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+
+from .config_watch import digest, file_digest
+
+# Section name -> how entries are keyed. Dict sections are keyed by their own
+# keys; list sections are stored keyed by `key_for` but loaded back as lists
+# in insertion order, matching the config.json layout.
+SECTIONS = {
+    'twilio_accounts': None,
+    'monitoring_jobs': None,
+    'alerts': lambda alert: alert['alert_name'],
+    'silence_periods': lambda period: f"{period['start']}/{period['end']}",
+}
+
+
+def key_for(section, value):
+    return SECTIONS[section](value)
+
+
+def _encode(value):
+    return value.to_dict()
+
+
+# config.json plus an append-only journal of per-entity changes next to it.
+# Each edit appends one JSON line ({"op": "put"|"delete", "section", "key",
+# "value"}) and fsyncs it, so an edit costs O(entry) instead of rewriting the
+# whole file. Loading reads the snapshot and replays the journal; a torn last
+# line from a crash mid-append is ignored. Once the journal reaches
+# `compact_every` entries (and on shutdown) the snapshot is rewritten to a
+# temporary file and renamed over config.json, so readers never see a
+# half-written config, and the journal is truncated. When config.json was
+# edited outside the app, load(external=True) drops the journal instead of
+# replaying it: the edited file is authoritative, and GUI changes not yet
+# compacted into it are discarded. To keep that window short, the store also
+# compacts once no edit has arrived for `compact_idle` seconds, so the file an
+# operator opens already holds the GUI's changes. A compaction never
+# overwrites a config.json that changed on disk since it was loaded or last
+# written; the journal is kept until that edit has been reloaded. `records`
+# maps a section to a record class (see records.py) whose from_dict wraps each
+# loaded entry.
+class ConfigStore:
+    def __init__(self, path='config.json', compact_every=1000, compact_idle=2.0, records=None):
+        self.path = path
+        self.records = records or {}
+        self.written_digest = None  # SHA-256 of the last config.json this store wrote
+        self.journal_path = f"{path}.journal"
+        self.compact_every = compact_every
+        self.compact_idle = compact_idle
+        self.file_digest = None  # SHA-256 of config.json as last loaded or written
+        self._idle_timer = None
+        self.sections = {name: {} for name in SECTIONS}
+        self._journal = None
+        self._entries = 0
+        self._lock = threading.Lock()
+
+    def load(self, external=False):
+        with self._lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                logging.warning(f"{self.path} not found. Starting with empty configuration.")
+                raw = None
+            # Parse before touching any state, so invalid JSON leaves the running config alone
+            data = json.loads(raw) if raw is not None else {}
+            self.file_digest = digest(raw) if raw is not None else None
+            if external:
+                if self._entries:
+                    logging.warning(f"{self.path} was edited outside the app; discarding {self._entries} "
+                                    f"journalled change(s) not yet written to it")
+                self._drop_journal()
+            self.sections = {name: {} for name in SECTIONS}
+            for name in SECTIONS:
+                values = data.get(name) or ({} if SECTIONS[name] is None else [])
+                if SECTIONS[name] is None:
+                    self.sections[name].update((key, self._decode(name, value)) for key, value in values.items())
+                else:
+                    self.sections[name].update((key_for(name, value), self._decode(name, value)) for value in values)
+            self._entries, damaged = self._replay()
+            # A torn line would swallow the next append, so start a fresh journal
+            if damaged or self._entries >= self.compact_every:
+                self._compact()
+            elif self._entries and self.compact_idle:
+                self._schedule_compaction()
+            return self.snapshot()
+
+    def _replay(self):
+        entries = damaged = 0
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning(f"Ignoring damaged line {line_number} in {self.journal_path}")
+                        damaged += 1
+                        continue
+                    self._apply(entry)
+                    entries += 1
+        except FileNotFoundError:
+            pass
+        return entries, damaged
+
+    def _decode(self, section, value):
+        record = self.records.get(section)
+        return record.from_dict(value) if record else value
+
+    def _apply(self, entry):
+        section = self.sections[entry['section']]
+        if entry['op'] == 'put':
+            section[entry['key']] = self._decode(entry['section'], entry['value'])
+        else:
+            section.pop(entry['key'], None)
+
+    # The configuration in config.json's layout; list sections become lists again
+    def snapshot(self):
+        return {
+            name: dict(entries) if SECTIONS[name] is None else list(entries.values())
+            for name, entries in self.sections.items()
+        }
+
+    def put(self, section, key, value):
+        self._append({'op': 'put', 'section': section, 'key': key, 'value': value})
+
+    def delete(self, section, key):
+        self._append({'op': 'delete', 'section': section, 'key': key})
+
+    def _append(self, entry):
+        line = json.dumps(entry, default=_encode) + '\n'
+        with self._lock:
+            self._apply(entry)
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a')
+            self._journal.write(line)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._entries += 1
+            if self._entries >= self.compact_every:
+                self._compact()
+            elif self.compact_idle:
+                self._schedule_compaction()
+
+    # Restarted by every edit, so a burst of edits is compacted once it's over
+    def _schedule_compaction(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.compact_idle, self._compact_when_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _compact_when_idle(self):
+        with self._lock:
+            if self._entries:
+                self._compact()
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        if file_digest(self.path) != self.file_digest:
+            logging.warning(f"Not compacting: {self.path} changed on disk and hasn't been reloaded yet")
+            return
+        tmp_path = f"{self.path}.tmp"
+        data = json.dumps(self.snapshot(), indent=4, default=_encode).encode()
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.written_digest = self.file_digest = digest(data)
+        # Only drop the journal once the snapshot containing it is in place
+        self._drop_journal()
+        logging.info(f"Compacted configuration into {self.path}")
+
+    def _drop_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_path, 'w').close()
+        self._entries = 0
+
+    def close(self):
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+            self._compact()
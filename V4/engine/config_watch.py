@@ -0,0 +1,139 @@
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    try:
+        with open(path, 'rb') as f:
+            return digest(f.read())
+    except FileNotFoundError:
+        return None
+
+
+# Minimal inotify binding over ctypes. Watches the file's directory rather
+# than the file itself, because editors and atomic writers replace the file
+# with a rename and a watch on the old inode would go quiet.
+class _Inotify:
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    # Names touched in the directory, waiting up to `timeout` seconds
+    def read(self, timeout):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names, offset = [], 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.append(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+# Calls on_change(digest) when a file's content changes. Uses inotify where
+# available and falls back to polling the file's stat every poll_interval
+# seconds. Bursts of writes are debounced until the file has been quiet for
+# `debounce` seconds, and the callback only runs when the SHA-256 of the
+# content differs from the last one seen, so touching or rewriting the file
+# with identical content is ignored.
+class ConfigWatcher:
+    def __init__(self, path, on_change, debounce=0.5, poll_interval=2.0):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.last_digest = file_digest(self.path)
+        self.mode = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        try:
+            inotify = _Inotify(os.path.dirname(self.path))
+            self.mode = 'inotify'
+        except (OSError, AttributeError) as e:
+            logging.info(f"inotify unavailable ({e}); polling {self.path} every {self.poll_interval}s")
+            inotify = None
+            self.mode = 'poll'
+        self._thread = threading.Thread(target=self._run, args=(inotify,), name='config-watch', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_ino, st.st_size, st.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _run(self, inotify):
+        name = os.path.basename(self.path)
+        last_stat = self._stat()
+        pending_since = None
+        try:
+            while not self._stopping.is_set():
+                if pending_since is None:
+                    wait = 1.0 if inotify else self.poll_interval
+                else:
+                    wait = max(0.0, pending_since + self.debounce - time.monotonic())
+                if inotify:
+                    changed = name in inotify.read(wait)
+                else:
+                    self._stopping.wait(wait)
+                    stat = self._stat()
+                    changed, last_stat = stat != last_stat, stat
+                if changed:
+                    pending_since = time.monotonic()
+                elif pending_since is not None and time.monotonic() - pending_since >= self.debounce:
+                    pending_since = None
+                    self._check()
+        finally:
+            if inotify:
+                inotify.close()
+
+    def _check(self):
+        current = file_digest(self.path)
+        if current is None or current == self.last_digest:
+            return
+        self.last_digest = current
+        try:
+            self.on_change(current)
+        except Exception as e:
+            logging.error(f"Reloading {self.path} failed: {e}")
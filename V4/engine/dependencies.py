@@ -0,0 +1,83 @@
+import logging
+import threading
+
+
+# DAG of job dependencies taken from each job's optional 'depends_on' list,
+# plus an implicit edge to any job that monitors the job's proxy URL. Edges
+# to unknown jobs or that would close a cycle are dropped with a log line.
+# Probe outcomes are recorded per job so a dependent can ask whether anything
+# upstream of it is currently failing.
+class DependencyGraph:
+    def __init__(self):
+        self.parents = {}
+        self.children = {}
+        self._failing = set()
+        self._lock = threading.Lock()
+
+    def build(self, monitoring_jobs):
+        parents = {name: [] for name in monitoring_jobs}
+        children = {name: [] for name in monitoring_jobs}
+        by_url = {job['url']: name for name, job in monitoring_jobs.items()}
+        for name, job in monitoring_jobs.items():
+            upstreams = list(job.get('depends_on') or [])
+            proxy_job = by_url.get(job.get('proxy'))
+            if proxy_job and proxy_job != name and proxy_job not in upstreams:
+                upstreams.append(proxy_job)
+            for upstream in upstreams:
+                if upstream not in monitoring_jobs:
+                    logging.warning(f"Job {name} depends on unknown job {upstream}; ignoring.")
+                elif upstream == name or self._reaches(children, name, upstream):
+                    logging.warning(f"Dependency {name} -> {upstream} would create a cycle; ignoring.")
+                else:
+                    parents[name].append(upstream)
+                    children[upstream].append(name)
+        with self._lock:
+            self.parents = parents
+            self.children = children
+            self._failing &= set(monitoring_jobs)
+
+    # True if `target` is reachable from `start` following child edges
+    @staticmethod
+    def _reaches(children, start, target):
+        stack, seen = [start], set()
+        while stack:
+            node = stack.pop()
+            if node == target:
+                return True
+            if node not in seen:
+                seen.add(node)
+                stack.extend(children.get(node, ()))
+        return False
+
+    # Records a probe outcome; returns True if the job's health changed
+    def mark(self, job_name, ok):
+        with self._lock:
+            was_failing = job_name in self._failing
+            if ok:
+                self._failing.discard(job_name)
+            else:
+                self._failing.add(job_name)
+            return was_failing == ok
+
+    # Nearest failing ancestor of the job, or None
+    def failing_upstream(self, job_name):
+        with self._lock:
+            queue, seen = list(self.parents.get(job_name, ())), set()
+            while queue:
+                node = queue.pop(0)
+                if node in self._failing:
+                    return node
+                if node not in seen:
+                    seen.add(node)
+                    queue.extend(self.parents.get(node, ()))
+        return None
+
+    def dependents(self, job_name):
+        with self._lock:
+            stack, seen = list(self.children.get(job_name, ())), []
+            while stack:
+                node = stack.pop()
+                if node not in seen:
+                    seen.append(node)
+                    stack.extend(self.children.get(node, ()))
+        return seen
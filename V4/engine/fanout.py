@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Caps how many deliveries run at once for the same key (a Twilio account),
+# while deliveries for other keys proceed in parallel.
+class KeyedLimiter:
+    def __init__(self, limit=4):
+        self.limit = limit
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = self._semaphores[key] = threading.BoundedSemaphore(self.limit)
+        with semaphore:
+            yield
+
+
+# Tracks each incident's fan-out: how long from detection until the first
+# and the last recipient was notified. start() is called before anything is
+# queued so fast deliveries can't finish before the incident exists; expect()
+# then records how many notifications were actually queued.
+class IncidentTracker:
+    def __init__(self, keep=500):
+        self.keep = keep
+        self._incidents = {}
+        self._lock = threading.Lock()
+
+    def start(self, incident_id, detected_at=None):
+        with self._lock:
+            self._incidents[incident_id] = {
+                'detected_at': detected_at or time.time(),
+                'expected': None,
+                'delivered': 0,
+                'failed': 0,
+                'time_to_first_notify': None,
+                'time_to_last_notify': None,
+            }
+            while len(self._incidents) > self.keep:
+                self._incidents.pop(next(iter(self._incidents)))
+
+    def expect(self, incident_id, expected):
+        with self._lock:
+            incident = self._incidents.get(incident_id)
+            if incident is None:
+                return
+            if not expected:
+                del self._incidents[incident_id]
+                return
+            incident['expected'] = expected
+            done = self._complete(incident, time.time())
+        if done:
+            self._log(incident_id, incident)
+
+    def finished(self, incident_id, ok, at=None):
+        at = at or time.time()
+        with self._lock:
+            incident = self._incidents.get(incident_id)
+            if incident is None:
+                return
+            if ok:
+                incident['delivered'] += 1
+                if incident['time_to_first_notify'] is None:
+                    incident['time_to_first_notify'] = at - incident['detected_at']
+            else:
+                incident['failed'] += 1
+            done = self._complete(incident, at)
+        if done:
+            self._log(incident_id, incident)
+
+    @staticmethod
+    def _complete(incident, at):
+        if incident['expected'] is None or incident['time_to_last_notify'] is not None:
+            return False
+        if incident['delivered'] + incident['failed'] < incident['expected']:
+            return False
+        incident['time_to_last_notify'] = at - incident['detected_at']
+        return True
+
+    @staticmethod
+    def _log(incident_id, incident):
+        first = incident['time_to_first_notify']
+        first_text = 'never' if first is None else f"after {first:.2f}s"
+        logging.info(f"Incident {incident_id}: {incident['delivered']}/{incident['expected']} delivered, "
+                     f"first {first_text}, last after {incident['time_to_last_notify']:.2f}s")
+
+    def report(self, incident_id):
+        with self._lock:
+            incident = self._incidents.get(incident_id)
+            return dict(incident) if incident else None
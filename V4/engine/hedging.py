@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# Runs a probe and, if it hasn't answered after `hedge_after` seconds (the
+# job's observed p95), fires a second identical probe and takes whichever
+# answers first without an error. The first probe still holds its pooled
+# connection, so the hedge goes out on another one. Hedges are paid for from
+# a budget: every probe earns `budget` tokens (0.05 = at most ~5% extra
+# requests) up to `burst`, and each hedge spends one. With no token to spend
+# the probe just runs on the caller's thread. Otherwise it runs on a pool
+# sized for `max_concurrency` callers plus `burst` hedges, and the hedge timer
+# starts only once the probe is actually running, so time spent queued for a
+# worker never triggers a hedge.
+class Hedger:
+    def __init__(self, budget=0.05, burst=10, max_concurrency=64):
+        self.budget = budget
+        self.burst = burst
+        self.tokens = 0.0
+        self.probes = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency + burst, thread_name_prefix='hedge')
+        self._lock = threading.Lock()
+
+    def _take_token(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.hedged += 1
+            return True
+
+    def run(self, key, probe, hedge_after=None):
+        with self._lock:
+            self.probes += 1
+            self.tokens = min(self.burst, self.tokens + self.budget)
+            can_hedge = self.tokens >= 1
+        if not self.budget or hedge_after is None or not can_hedge:
+            return probe()
+
+        started = threading.Event()
+        times = {}
+
+        def timed_probe():
+            times['start'] = time.perf_counter()
+            started.set()
+            return probe()
+
+        primary = self._executor.submit(timed_probe)
+        started.wait()
+        done, _ = wait([primary], timeout=max(0, times['start'] + hedge_after - time.perf_counter()))
+        if done or not self._take_token():
+            return primary.result()
+        start = times['start']
+
+        logging.info(f"Hedging probe for {key} after {hedge_after:.2f}s")
+        hedge = self._executor.submit(probe)
+        pending = {primary, hedge}
+        first = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if first is None:
+                    first = (future, result)
+                if result['error'] is None:
+                    first = (future, result)
+                    pending = set()
+                    break
+        winner, result = first
+        if winner is hedge:
+            with self._lock:
+                self.hedge_wins += 1
+        # Report latency as the caller saw it, not from when the hedge went out
+        return result.copy(elapsed=time.perf_counter() - start, hedged=True)
+
+    def stats(self):
+        with self._lock:
+            return {'probes': self.probes, 'hedged': self.hedged, 'hedge_wins': self.hedge_wins,
+                    'tokens': self.tokens}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
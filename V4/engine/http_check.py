@@ -0,0 +1,45 @@
+import time
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from .body_match import DEFAULT_MAX_BODY_BYTES, stream_search
+from .records import ProbeResult
+from .timeouts import ProbeTimeout
+
+
+# Single in-process HTTP check. Without a regex only the status line and
+# headers are needed, so a HEAD request is sent; servers that refuse HEAD get
+# one GET retry. With a regex the same GET response provides both the status
+# and the body, which is streamed and matched without buffering the whole page.
+# `timeout` is requests' (connect, read) pair; `total_timeout` bounds the whole
+# check including the body download. Timeouts are reported as timed_out rather
+# than as a generic error. Redirects are followed unless allow_redirects is
+# False, in which case the 3xx status itself is reported.
+def check_http(sessions, url, regex=None, proxy='', max_body_bytes=DEFAULT_MAX_BODY_BYTES,
+               timeout=None, total_timeout=None, allow_redirects=True, **kwargs):
+    method = 'GET' if regex else 'HEAD'
+    result = ProbeResult(url=url, method=method, headers={})
+    start = time.perf_counter()
+    deadline = start + total_timeout if total_timeout else None
+    kwargs['timeout'] = timeout
+    kwargs['allow_redirects'] = allow_redirects
+    try:
+        response = sessions.request(method, url, proxy, stream=bool(regex), **kwargs)
+        if method == 'HEAD' and response.status_code in (405, 501):
+            result['method'] = 'GET'
+            response = sessions.request('GET', url, proxy, stream=True, **kwargs)
+            response.close()
+        result['status_code'] = response.status_code
+        result['headers'] = dict(response.headers)
+        if regex:
+            result.update(stream_search(response, regex, max_body_bytes, deadline=deadline))
+    except (requests.Timeout, ProbeTimeout) as e:
+        result['timed_out'] = True
+        result['error'] = e
+    except requests.RequestException as e:
+        # A read timeout while streaming the body surfaces as ConnectionError
+        result['timed_out'] = bool(e.args) and isinstance(e.args[0], ReadTimeoutError)
+        result['error'] = e
+    result['elapsed'] = time.perf_counter() - start
+    return result
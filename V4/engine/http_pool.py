@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Keeps one keep-alive requests.Session per (scheme, host, proxy) so repeated
+# probes against the same host reuse their TCP/TLS connections instead of
+# handshaking on every request. Sessions idle for longer than idle_timeout are
+# closed on the next lookup.
+class SessionManager:
+    def __init__(self, pool_maxsize=10, idle_timeout=300, evict_every=60):
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self.evict_every = evict_every
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._last_eviction = time.monotonic()
+
+    @staticmethod
+    def pool_key(url, proxy=''):
+        parts = urlsplit(url)
+        return parts.scheme.lower(), parts.netloc.lower(), proxy or ''
+
+    def session(self, url, proxy=''):
+        return self._pool(url, proxy)['session']
+
+    def _pool(self, url, proxy):
+        key = self.pool_key(url, proxy)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_eviction >= self.evict_every:
+                self._evict_idle(now)
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = self._new_pool(proxy, now)
+            pool['last_used'] = now
+            return pool
+
+    def _new_pool(self, proxy, now):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if proxy:
+            session.proxies = {'http': proxy, 'https': proxy}
+        return {
+            'session': session,
+            'created': now,
+            'last_used': now,
+            'requests': 0,
+            'errors': 0,
+        }
+
+    def request(self, method, url, proxy='', **kwargs):
+        pool = self._pool(url, proxy)
+        failed = False
+        try:
+            return pool['session'].request(method, url, **kwargs)
+        except requests.RequestException:
+            failed = True
+            raise
+        finally:
+            # Probe threads share pools, so the counters are only touched under the lock
+            with self._lock:
+                pool['requests'] += 1
+                if failed:
+                    pool['errors'] += 1
+
+    def get(self, url, proxy='', **kwargs):
+        return self.request('GET', url, proxy, **kwargs)
+
+    def head(self, url, proxy='', **kwargs):
+        return self.request('HEAD', url, proxy, **kwargs)
+
+    def evict_idle(self):
+        with self._lock:
+            self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now):
+        self._last_eviction = now
+        for key, pool in list(self._pools.items()):
+            if now - pool['last_used'] >= self.idle_timeout:
+                pool['session'].close()
+                del self._pools[key]
+                logging.info(f"Closed idle HTTP pool for {key[0]}://{key[1]}")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'scheme': scheme,
+                    'host': host,
+                    'proxy': proxy,
+                    'requests': pool['requests'],
+                    'errors': pool['errors'],
+                    'age': now - pool['created'],
+                    'idle': now - pool['last_used'],
+                }
+                for (scheme, host, proxy), pool in self._pools.items()
+            ]
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool['session'].close()
+            self._pools.clear()
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+
+KIND_LABELS = {'fire': 'DOWN', 'renotify': 'STILL DOWN', 'resolve': 'RESOLVED'}
+
+
+# One line per notification kind listing the affected jobs, cut to max_length
+# with a "+N more" tail so a large outage still fits in an SMS.
+def summarize(entries, max_length=320):
+    latest = {}
+    for kind, job_name in entries:
+        latest.pop(job_name, None)
+        latest[job_name] = kind
+
+    parts = []
+    for kind, label in KIND_LABELS.items():
+        jobs = [job for job, job_kind in latest.items() if job_kind == kind]
+        if jobs:
+            parts.append((label, jobs))
+
+    message = 'Monitoring:'
+    total = sum(len(jobs) for _, jobs in parts)
+    shown = 0
+    for n, (label, jobs) in enumerate(parts):
+        section = f"{';' if n else ''} {label}:"
+        for i, job in enumerate(jobs):
+            piece = f"{section if i == 0 else ','} {job}"
+            more = f" +{total - shown - 1} more" if total - shown - 1 else ''
+            if len(message) + len(piece) + len(more) > max_length:
+                return f"{message} +{total - shown} more"[:max_length]
+            message += piece
+            shown += 1
+    return message
+
+
+# Collects notifications for a short window and hands them on grouped by
+# (account, method, recipient), so a recipient gets one summary listing every
+# affected job instead of one message per job. The window opens with the
+# first notification and `flush` receives the list of grouped batches when it
+# closes. A window of 0 flushes every notification immediately.
+class IncidentBatcher:
+    def __init__(self, flush, window=30, max_length=320):
+        self.flush_batches = flush
+        self.window = window
+        self.max_length = max_length
+        self._groups = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, account_name, method, number, kind, job_name):
+        with self._lock:
+            group = self._groups.setdefault((account_name, method, number),
+                                            {'entries': [], 'detected_at': time.time()})
+            group['entries'].append((kind, job_name))
+            if self.window and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if not self.window:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            groups, self._groups = self._groups, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not groups:
+            return
+        batches = [
+            {
+                'account': account_name,
+                'method': method,
+                'to': number,
+                'message': summarize(group['entries'], self.max_length),
+                'jobs': len({job for _, job in group['entries']}),
+                'detected_at': group['detected_at'],
+            }
+            for (account_name, method, number), group in groups.items()
+        ]
+        try:
+            self.flush_batches(batches)
+        except Exception as e:
+            logging.error(f"Failed to queue {len(batches)} batched notifications: {e}")
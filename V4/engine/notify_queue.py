@@ -0,0 +1,204 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedupe_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS notifications_open_key
+    ON notifications (dedupe_key) WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS notifications_due
+    ON notifications (status, next_attempt);
+"""
+
+
+# Raised by a deliver function to put a notification back without counting an
+# attempt, e.g. when the account is rate limited.
+class Deferred(Exception):
+    def __init__(self, delay, reason=''):
+        super().__init__(reason or f"deferred for {delay:.1f}s")
+        self.delay = delay
+
+
+# Durable outbound notification queue in SQLite (WAL mode). Probe workers only
+# enqueue; a small pool of delivery threads drains the queue and retries
+# failures with exponential backoff. A notification whose dedupe_key is
+# already waiting or being sent is dropped, so repeated failures of the same
+# alert don't pile up duplicate calls while the provider is slow. on_done, if
+# given, is called with (payload, error) once a notification is sent or gives up.
+class NotificationQueue:
+    def __init__(self, deliver, path='notifications.db', workers=4, max_attempts=5,
+                 base_delay=5, max_delay=600, keep_sent=7 * 24 * 3600, on_done=None):
+        self.deliver = deliver
+        self.on_done = on_done
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.keep_sent = keep_sent
+        self._wakeup = threading.Condition()
+        self._enqueued = 0  # Bumped under _wakeup on every enqueue, so workers can't miss one
+        self._stopping = False
+        self._threads = []
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            # Anything left 'sending' was interrupted by a crash or shutdown
+            self._conn.execute("UPDATE notifications SET status = 'pending' WHERE status = 'sending'")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'notify-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._conn.close()
+
+    def enqueue(self, dedupe_key, payload):
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO notifications (dedupe_key, payload, next_attempt, created, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (dedupe_key, json.dumps(payload), now, now, now))
+        if cursor.rowcount:
+            with self._wakeup:
+                self._enqueued += 1
+                self._wakeup.notify()
+            return True
+        logging.info(f"Notification {dedupe_key} already queued; skipped duplicate.")
+        return False
+
+    def depth(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM notifications GROUP BY status").fetchall()
+        return dict(rows)
+
+    # Notifications waiting or in flight, per Twilio account
+    def depth_by_account(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT json_extract(payload, '$.account'), COUNT(*) FROM notifications "
+                "WHERE status IN ('pending', 'sending') GROUP BY 1").fetchall()
+        return dict(rows)
+
+    def _claim(self, conn):
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT id, dedupe_key, payload, attempts FROM notifications "
+                "WHERE status = 'pending' AND next_attempt <= ? ORDER BY next_attempt LIMIT 1",
+                (now,)).fetchone()
+            if row:
+                conn.execute("UPDATE notifications SET status = 'sending', updated = ? WHERE id = ?", (now, row[0]))
+                conn.execute('COMMIT')
+                return row, None
+            due = conn.execute(
+                "SELECT MIN(next_attempt) FROM notifications WHERE status = 'pending'").fetchone()[0]
+            conn.execute('COMMIT')
+            return None, due
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _finish(self, conn, row_id, attempts, error):
+        now = time.time()
+        if error is None:
+            conn.execute("UPDATE notifications SET status = 'sent', attempts = ?, updated = ? WHERE id = ?",
+                         (attempts, now, row_id))
+        elif attempts >= self.max_attempts:
+            conn.execute("UPDATE notifications SET status = 'failed', attempts = ?, last_error = ?, updated = ? "
+                         "WHERE id = ?", (attempts, error, now, row_id))
+        else:
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            conn.execute("UPDATE notifications SET status = 'pending', attempts = ?, last_error = ?, "
+                         "next_attempt = ?, updated = ? WHERE id = ?",
+                         (attempts, error, now + delay, now, row_id))
+
+    def _defer(self, conn, row_id, delay):
+        now = time.time()
+        conn.execute("UPDATE notifications SET status = 'pending', next_attempt = ?, updated = ? WHERE id = ?",
+                     (now + delay, now, row_id))
+
+    def _purge(self, conn):
+        conn.execute("DELETE FROM notifications WHERE status IN ('sent', 'failed') AND updated < ?",
+                     (time.time() - self.keep_sent,))
+
+    # Each iteration is guarded so a failing deliver, on_done or database call
+    # costs one notification, not the worker. The enqueue counter is read
+    # before claiming and checked again under the lock before waiting, so a
+    # notification enqueued in between wakes the worker instead of being missed.
+    def _work(self):
+        conn = self._connect()
+        last_purge = 0
+        try:
+            while not self._stopping:
+                with self._wakeup:
+                    seen = self._enqueued
+                try:
+                    row, due = self._claim(conn)
+                    if row is not None:
+                        self._process(conn, row)
+                        continue
+                    if time.time() - last_purge > 3600:
+                        last_purge = time.time()
+                        self._purge(conn)
+                except Exception as e:
+                    logging.error(f"Notification queue error: {e}")
+                    due = time.time() + 1
+                with self._wakeup:
+                    if not self._stopping and self._enqueued == seen:
+                        self._wakeup.wait(None if due is None else max(0, due - time.time()))
+        finally:
+            conn.close()
+
+    def _process(self, conn, row):
+        row_id, dedupe_key, payload, attempts = row
+        try:
+            payload = json.loads(payload)
+        except ValueError as e:
+            logging.error(f"Dropping notification {dedupe_key} with unreadable payload: {e}")
+            self._finish(conn, row_id, self.max_attempts, f"unreadable payload: {e}")
+            return
+        error = None
+        try:
+            self.deliver(payload)
+        except Deferred as e:
+            self._defer(conn, row_id, e.delay)
+            return
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Delivery of {dedupe_key} failed (attempt {attempts + 1}): {e}")
+        self._finish(conn, row_id, attempts + 1, error)
+        if self.on_done and (error is None or attempts + 1 >= self.max_attempts):
+            try:
+                self.on_done(payload, error)
+            except Exception as e:
+                logging.error(f"Notification callback for {dedupe_key} failed: {e}")
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .scheduler import Scheduler, jitter
+from .silence import SilenceIndex
+
+
+# Drives every alert from a single asyncio event loop running on a background
+# thread. Next-run times for all alerts live in one heap; a dispatcher sleeps
+# until the earliest is due, so idle alerts cost nothing but a heap entry.
+# Only the blocking probe call itself borrows a worker from a bounded pool.
+# Alerts that come due inside a silence window are parked until it ends.
+class ProbeEngine:
+    def __init__(self, probe, max_concurrency=64, silences=None):
+        self.probe = probe
+        self.max_concurrency = max_concurrency
+        self.silences = silences or SilenceIndex()
+        self.loop = None
+        self.alerts = {}
+        self.scheduler = Scheduler()
+        self.parked = set()
+        self._inflight = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='probe')
+        self._semaphore = None
+        self._wakeup = None
+        self._dispatcher = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.loop is not None:
+                return
+            threading.Thread(target=self._run, name='probe-engine', daemon=True).start()
+            self._ready.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._dispatcher = self.loop.create_task(self._dispatch())
+        self._ready.set()
+        self.loop.run_forever()
+
+    def shutdown(self, timeout=5):
+        if self.loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), self.loop).result(timeout)
+        except Exception as e:
+            logging.error(f"Probe engine did not drain cleanly: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._executor.shutdown(wait=False)
+
+    # Thread-safe entry points used by the Tk callbacks
+    def add(self, alert):
+        self.start()
+        self.loop.call_soon_threadsafe(self._add, alert)
+
+    # Swap in a new version of an alert without restarting its probe; only a
+    # changed scrape_interval moves its next run
+    def update(self, alert):
+        self.start()
+        self.loop.call_soon_threadsafe(self._update, alert)
+
+    def remove(self, alert_name):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._remove, alert_name)
+
+    def reschedule(self, alert_name, delay=0):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._reschedule, alert_name, delay)
+
+    def set_silences(self, silences):
+        if self.loop is None:
+            self.silences = silences
+        else:
+            self.loop.call_soon_threadsafe(self._set_silences, silences)
+
+    def running(self):
+        return list(self.alerts)
+
+    def _add(self, alert):
+        name = alert['alert_name']
+        if name in self.alerts:
+            return
+        self.alerts[name] = alert
+        self._schedule(name, self.loop.time() + jitter(name, alert['scrape_interval']))
+
+    def _update(self, alert):
+        name = alert['alert_name']
+        current = self.alerts.get(name)
+        if not alert['monitoring']:
+            self._remove(name)
+        elif current is None:
+            self._add(alert)
+        else:
+            self.alerts[name] = alert
+            if alert['scrape_interval'] != current['scrape_interval']:
+                self._schedule(name, self.loop.time() + jitter(name, alert['scrape_interval']))
+
+    def _remove(self, alert_name):
+        self.alerts.pop(alert_name, None)
+        self.parked.discard(alert_name)
+        self.scheduler.cancel(alert_name)
+        task = self._inflight.pop(alert_name, None)
+        if task:
+            task.cancel()
+
+    def _reschedule(self, alert_name, delay):
+        if alert_name in self.alerts:
+            self._schedule(alert_name, self.loop.time() + delay)
+
+    # Windows may have been shortened or removed; let parked alerts re-check now
+    def _set_silences(self, silences):
+        self.silences = silences
+        for alert_name in self.parked:
+            self._schedule(alert_name, self.loop.time())
+
+    def _schedule(self, alert_name, due):
+        earliest = self.scheduler.next_due()
+        self.scheduler.schedule(alert_name, due)
+        if earliest is None or due < earliest:
+            self._wakeup.set()
+
+    async def _drain(self):
+        self._dispatcher.cancel()
+        tasks = [self._dispatcher] + list(self._inflight.values())
+        for alert_name in list(self.alerts):
+            self._remove(alert_name)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _dispatch(self):
+        while True:
+            now = self.loop.time()
+            for alert_name, due in self.scheduler.pop_due(now):
+                alert = self.alerts.get(alert_name)
+                if alert is None or not alert['monitoring']:
+                    self.alerts.pop(alert_name, None)
+                    continue
+                silenced_until = self.silences.silenced_until(time.time())
+                if silenced_until is not None:
+                    if alert_name not in self.parked:
+                        self.parked.add(alert_name)
+                        logging.info(f"Parked {alert_name} until silence ends")
+                    # Re-spread on release so a long silence doesn't end in a burst
+                    release = silenced_until + jitter(alert_name, alert['scrape_interval'])
+                    self._schedule(alert_name, now + release - time.time())
+                    continue
+                self.parked.discard(alert_name)
+                if alert_name in self._inflight:
+                    # Previous probe still running; try again next interval
+                    self._schedule(alert_name, self._next_due(due, alert, now))
+                    continue
+                self._inflight[alert_name] = self.loop.create_task(self._probe(alert, due))
+
+            next_due = self.scheduler.next_due()
+            timeout = None if next_due is None else max(0, next_due - self.loop.time())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # Advance from the slot that was due rather than from completion time so
+    # probes keep their phase and don't drift.
+    @staticmethod
+    def _next_due(due, alert, now):
+        interval = alert['scrape_interval'] or 1
+        next_due = due + interval
+        if next_due <= now:
+            next_due += ((now - next_due) // interval + 1) * interval
+        return next_due
+
+    # The probe may return a number of seconds to wait before the next run,
+    # e.g. to back off while something upstream is down; otherwise the alert
+    # keeps its regular cadence.
+    async def _probe(self, alert, due):
+        alert_name = alert['alert_name']
+        delay = None
+        try:
+            async with self._semaphore:
+                delay = await self.loop.run_in_executor(self._executor, self.probe, alert)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Probe for {alert_name} raised: {e}")
+        finally:
+            if self._inflight.get(alert_name) is asyncio.current_task():
+                del self._inflight[alert_name]
+        # The alert may have been updated meanwhile; leave it alone if something
+        # else (an update or reschedule) has already queued its next run
+        alert = self.alerts.get(alert_name)
+        if alert is not None and alert['monitoring'] and alert_name not in self.scheduler:
+            now = self.loop.time()
+            if isinstance(delay, (int, float)) and delay > 0:
+                self._schedule(alert_name, now + delay)
+            else:
+                self._schedule(alert_name, self._next_due(due, alert, now))
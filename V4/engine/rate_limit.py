@@ -0,0 +1,100 @@
+import threading
+import time
+
+DEFAULT_RATES = {'calls': 1.0, 'messages': 1.0}  # Twilio's default per-number limits, per second
+
+
+# Token bucket whose rate can be cut when the provider pushes back (HTTP 429)
+# and then creeps back up towards the configured rate as sends succeed.
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.configured_rate = rate
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.paused_until = 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Takes a token and returns 0, or returns the seconds until one is available
+    def take(self, now):
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def throttled(self, now, retry_after=None):
+        self.rate = max(self.configured_rate / 16, self.rate / 2)
+        self.tokens = 0.0
+        self.paused_until = now + (retry_after if retry_after else 1 / self.rate)
+
+    def succeeded(self):
+        if self.rate < self.configured_rate:
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate / 10)
+
+
+# Per-(account, channel) token buckets. Rates come from the account entry's
+# calls_per_second / messages_per_second, falling back to DEFAULT_RATES.
+# Sends that have to wait are counted per account so queue depth is visible.
+class RateLimiter:
+    def __init__(self, rates=None):
+        self.rates = dict(DEFAULT_RATES, **(rates or {}))
+        self._buckets = {}
+        self._waiting = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, account_name, channel, account_info):
+        key = (account_name, channel)
+        rate = float(account_info.get(f"{channel}_per_second") or self.rates[channel])
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.configured_rate != rate:
+            bucket = self._buckets[key] = TokenBucket(rate)
+        return bucket
+
+    def try_acquire(self, account_name, channel, account_info):
+        with self._lock:
+            return self._bucket(account_name, channel, account_info).take(time.monotonic())
+
+    # Blocks until a token is available, up to max_wait seconds. Returns the
+    # remaining wait if it would exceed max_wait, 0 once a token is taken.
+    def acquire(self, account_name, channel, account_info, max_wait=1.0):
+        with self._lock:
+            self._waiting[account_name] = self._waiting.get(account_name, 0) + 1
+        try:
+            while True:
+                wait = self.try_acquire(account_name, channel, account_info)
+                if wait == 0 or wait > max_wait:
+                    return wait
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self._waiting[account_name] -= 1
+
+    def throttled(self, account_name, channel, account_info, retry_after=None):
+        with self._lock:
+            self._bucket(account_name, channel, account_info).throttled(time.monotonic(), retry_after)
+
+    def succeeded(self, account_name, channel, account_info):
+        with self._lock:
+            self._bucket(account_name, channel, account_info).succeeded()
+
+    def waiting(self):
+        with self._lock:
+            return {name: count for name, count in self._waiting.items() if count}
+
+    def stats(self):
+        with self._lock:
+            return {
+                f"{account_name}/{channel}": {
+                    'rate': bucket.rate,
+                    'configured_rate': bucket.configured_rate,
+                    'paused_for': max(0.0, bucket.paused_until - time.monotonic()),
+                }
+                for (account_name, channel), bucket in self._buckets.items()
+            }
@@ -0,0 +1,257 @@
+import ctypes
+import errno
+import itertools
+import logging
+import os
+import selectors
+import socket
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .records import ProbeResult
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+# Accepts either a bare host name ("fileserver01"), host:port or a URL and
+# returns the host and the port a TCP probe should connect to; default_port
+# when neither the target nor its scheme names one.
+def parse_target(url, default_port=80):
+    parts = urlsplit(url if '//' in url else f"//{url}")
+    return parts.hostname or url, parts.port or DEFAULT_PORTS.get(parts.scheme, default_port)
+
+
+# Opens non-blocking connections to every (host, port) at once and waits on a
+# single selector, so a batch costs one timeout rather than one per host.
+def tcp_connect_many(targets, timeout=2):
+    results = {target: None for target in targets}
+    selector = selectors.DefaultSelector()
+    start = time.perf_counter()
+    try:
+        for target in targets:
+            try:
+                addr = socket.getaddrinfo(*target, type=socket.SOCK_STREAM)[0]
+                sock = socket.socket(addr[0], addr[1], addr[2])
+            except OSError:
+                continue
+            sock.setblocking(False)
+            if sock.connect_ex(addr[4]) in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, 10035):  # 10035: WSAEWOULDBLOCK
+                selector.register(sock, selectors.EVENT_WRITE, target)
+            else:
+                sock.close()
+
+        deadline = start + timeout
+        while selector.get_map():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                sock = key.fileobj
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    results[key.data] = time.perf_counter() - start
+                selector.unregister(sock)
+                sock.close()
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+    return results
+
+
+def _checksum(data):
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+# Unprivileged ICMP echo over one SOCK_DGRAM socket shared by every caller.
+# Each outstanding echo gets its own sequence number, so any number of probe
+# threads can have pings in flight while one receiver thread matches replies.
+# Needs Linux (with ping_group_range covering our gid) or macOS; Windows uses
+# WindowsPinger below, and callers fall back to TCP connect when
+# open_pinger() returns None.
+class Pinger:
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        self._ident = os.getpid() & 0xFFFF
+        self._seq = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._receive, name='icmp-receiver', daemon=True).start()
+
+    def _receive(self):
+        while True:
+            try:
+                packet, (addr, _) = self._sock.recvfrom(2048)
+            except OSError:
+                return
+            if packet and packet[0] >> 4 == 4:  # macOS includes the IP header
+                packet = packet[(packet[0] & 0x0F) * 4:]
+            if len(packet) < 8:
+                continue
+            icmp_type, _, _, _, seq = struct.unpack('!BBHHH', packet[:8])
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            with self._lock:
+                pending = self._pending.get(seq)
+            if pending and pending['addr'] == addr:
+                pending['rtt'] = time.perf_counter() - pending['sent']
+                pending['done'].set()
+
+    def _send(self, host):
+        addr = socket.gethostbyname(host)
+        seq = next(self._seq) & 0xFFFF
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, self._ident, seq)
+        payload = struct.pack('!d', time.time())
+        packet = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, _checksum(header + payload), self._ident, seq) + payload
+        pending = {'addr': addr, 'sent': time.perf_counter(), 'done': threading.Event(), 'rtt': None}
+        with self._lock:
+            self._pending[seq] = pending
+        self._sock.sendto(packet, (addr, 0))
+        return seq, pending
+
+    def ping(self, host, timeout=2):
+        return self.ping_many([host], timeout)[host]
+
+    def ping_many(self, hosts, timeout=2):
+        sent = {}
+        for host in hosts:
+            try:
+                sent[host] = self._send(host)
+            except OSError as e:
+                logging.error(f"ICMP echo to {host} failed: {e}")
+        deadline = time.perf_counter() + timeout
+        results = {}
+        for host in hosts:
+            if host not in sent:
+                results[host] = None
+                continue
+            seq, pending = sent[host]
+            pending['done'].wait(max(0, deadline - time.perf_counter()))
+            with self._lock:
+                self._pending.pop(seq, None)
+            results[host] = pending['rtt']
+        return results
+
+    def close(self):
+        self._sock.close()
+
+
+class _IpOptionInformation(ctypes.Structure):
+    _fields_ = [('Ttl', ctypes.c_ubyte), ('Tos', ctypes.c_ubyte), ('Flags', ctypes.c_ubyte),
+                ('OptionsSize', ctypes.c_ubyte), ('OptionsData', ctypes.c_void_p)]
+
+
+class _IcmpEchoReply(ctypes.Structure):
+    _fields_ = [('Address', ctypes.c_ulong), ('Status', ctypes.c_ulong), ('RoundTripTime', ctypes.c_ulong),
+                ('DataSize', ctypes.c_ushort), ('Reserved', ctypes.c_ushort), ('Data', ctypes.c_void_p),
+                ('Options', _IpOptionInformation)]
+
+
+# ICMP echo through the Windows ICMP helper API (IcmpSendEcho), which needs no
+# administrator rights, unlike raw sockets. Each call blocks its thread, so
+# ping_many spreads a batch over a small pool and every echo is in flight at
+# once.
+class WindowsPinger:
+    PAYLOAD = b'url-monitor'
+
+    def __init__(self, max_workers=32):
+        iphlpapi = ctypes.WinDLL('iphlpapi.dll', use_last_error=True)
+        self._create = iphlpapi.IcmpCreateFile
+        self._create.restype = ctypes.c_void_p
+        self._send = iphlpapi.IcmpSendEcho
+        self._send.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_char_p, ctypes.c_ushort,
+                               ctypes.c_void_p, ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong]
+        self._close_handle = iphlpapi.IcmpCloseHandle
+        self._close_handle.argtypes = [ctypes.c_void_p]
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='icmp')
+
+    def ping(self, host, timeout=2):
+        try:
+            # IPAddr is the address's bytes in network order read as a native ULONG
+            addr = struct.unpack('=L', socket.inet_aton(socket.gethostbyname(host)))[0]
+        except OSError as e:
+            logging.error(f"ICMP echo to {host} failed: {e}")
+            return None
+        handle = self._create()
+        if handle in (None, ctypes.c_void_p(-1).value):
+            logging.error(f"IcmpCreateFile failed: {ctypes.get_last_error()}")
+            return None
+        try:
+            reply = ctypes.create_string_buffer(ctypes.sizeof(_IcmpEchoReply) + len(self.PAYLOAD) + 8)
+            start = time.perf_counter()
+            answered = self._send(handle, addr, self.PAYLOAD, len(self.PAYLOAD), None,
+                                  reply, len(reply), int(timeout * 1000))
+            rtt = time.perf_counter() - start
+        finally:
+            self._close_handle(handle)
+        if not answered or _IcmpEchoReply.from_buffer(reply).Status != 0:
+            return None
+        return rtt
+
+    def ping_many(self, hosts, timeout=2):
+        return dict(zip(hosts, self._executor.map(lambda host: self.ping(host, timeout), hosts)))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def open_pinger():
+    try:
+        return WindowsPinger() if sys.platform == 'win32' else Pinger()
+    except (OSError, AttributeError) as e:
+        logging.warning(f"Unprivileged ICMP not available ({e}); using TCP connect probes.")
+        return None
+
+
+# Reachability checks with the same result shape as engine.http_check, so
+# intranet jobs flow through the same alert evaluation as HTTP jobs. They use
+# an ICMP echo when a pinger is available, else a TCP connect to `port` (or
+# the port in the URL, or 80/443 by scheme). A bare host with no port can't be
+# checked over TCP, since a host that answers ping but runs no server on a
+# guessed port would look down, so it is reported as unconfigured instead.
+def check_host(pinger, url, timeout=2, port=None):
+    return check_hosts(pinger, [url], timeout, {url: port} if port else None)[url]
+
+
+# Batch form of check_host: every target is probed at once, sharing one ICMP
+# socket (or one selector of TCP connects), so a sweep costs one timeout
+# rather than one per host. `ports` optionally maps a target to its port.
+def check_hosts(pinger, urls, timeout=2, ports=None):
+    ports = ports or {}
+    targets = {}
+    for url in urls:
+        host, port = parse_target(url, default_port=None)
+        targets[url] = host, ports.get(url) or port
+    if pinger is not None:
+        rtts = pinger.ping_many(list(dict.fromkeys(host for host, _ in targets.values())), timeout)
+        return {url: _host_result(url, host, 'icmp', rtts[host]) for url, (host, _) in targets.items()}
+    rtts = tcp_connect_many([target for target in dict.fromkeys(targets.values()) if target[1]], timeout)
+    results = {}
+    for url, (host, port) in targets.items():
+        if port is None:
+            results[url] = ProbeResult(url=url, method='tcp', headers={}, error=ValueError(
+                f"ICMP is unavailable and {url} has no port to connect to; set one with host:port"))
+        else:
+            results[url] = _host_result(url, host, 'tcp', rtts.get((host, port)))
+    return results
+
+
+def _host_result(url, host, method, rtt):
+    return ProbeResult(
+        url=url,
+        method=method,
+        headers={},
+        elapsed=rtt,
+        timed_out=rtt is None and method == 'icmp',
+        error=None if rtt is not None else ConnectionError(f"{host} did not answer {method} probe"),
+    )
@@ -0,0 +1,200 @@
+import logging
+import sys
+
+
+# Compact records for the objects there are many of (jobs, alerts, accounts,
+# probe results). Each is a __slots__ class, so an instance costs a fixed few
+# bytes per field instead of a per-instance dict. They still support the
+# mapping access the rest of the code uses (record['url'], record.get(...),
+# record['monitoring'] = False), and round-trip through the config.json layout
+# with from_dict / to_dict. Unset optional fields are None and are left out of
+# to_dict; keys a record doesn't know about are kept in `extra` and written
+# back unchanged. Strings in INTERNED fields repeat across many records (job
+# and account names, URL types) and are interned so they're stored once.
+class Record:
+    __slots__ = ('extra',)
+    FIELDS = {}
+    INTERNED = ()
+
+    def __init__(self, **values):
+        pop = values.pop
+        for name, default in self.FIELDS.items():
+            setattr(self, name, pop(name, default))
+        for name in self.INTERNED:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+        self.extra = values or None
+
+    @classmethod
+    def from_dict(cls, data):
+        return data if isinstance(data, cls) else cls(**data)
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key) is not None
+        return bool(self.extra) and key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+
+    def copy(self, **changes):
+        record = type(self).__new__(type(self))
+        for name in self.__class__.__slots__ + Record.__slots__:
+            setattr(record, name, getattr(self, name))
+        if record.extra:
+            record.extra = dict(record.extra)
+        record.update(changes)
+        return record
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    # Records are mutable and compare by value, so they must not be hashable
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class TwilioAccount(Record):
+    FIELDS = {
+        'account_sid': None,
+        'auth_token': None,
+        'twilio_number': None,
+        'recipient_numbers': None,
+        'methods': None,
+        'calls_per_second': None,
+        'messages_per_second': None,
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Job(Record):
+    FIELDS = {
+        'url': None,
+        'url_type': 'text',
+        'regex': '',
+        'proxy': '',
+        'max_body_bytes': None,
+        'connect_timeout': None,
+        'read_timeout': None,
+        'total_timeout': None,
+        'depends_on': None,
+        'follow_redirects': None,
+        'port': None,
+    }
+    INTERNED = ('url_type', 'proxy')
+    __slots__ = tuple(FIELDS)
+
+
+# response_codes is parsed once into a tuple of ints, so monitor_alert doesn't
+# re-parse the strings on every probe; to_dict writes them back as strings in
+# the config.json layout. Codes that aren't HTTP status numbers (e.g. "2xx")
+# are logged and dropped rather than failing the whole config load.
+class Alert(Record):
+    FIELDS = {
+        'alert_name': None,
+        'job_name': None,
+        'twilio_account': None,
+        'scrape_interval': None,
+        'response_codes': None,
+        'send_recovery': None,
+        'monitoring': True,
+        'fail_threshold': None,
+        'renotify_interval': None,
+        'min_interval': None,
+        'max_interval': None,
+    }
+    INTERNED = ('job_name', 'twilio_account')
+    __slots__ = tuple(FIELDS)
+
+    def __init__(self, **values):
+        super().__init__(**values)
+        self.response_codes = self._parse_codes(self.response_codes)
+
+    @staticmethod
+    def _split_codes(codes):
+        valid, invalid = [], []
+        for code in codes or ():
+            text = str(code).strip()
+            if not text:
+                continue
+            try:
+                number = int(text)
+            except ValueError:
+                number = None
+            if number is not None and 100 <= number <= 599:
+                valid.append(number)
+            else:
+                invalid.append(text)
+        return tuple(valid), invalid
+
+    @classmethod
+    def invalid_codes(cls, codes):
+        return cls._split_codes(codes)[1]
+
+    def _parse_codes(self, codes):
+        valid, invalid = self._split_codes(codes)
+        if invalid:
+            logging.warning(f"Alert {self.alert_name}: ignoring invalid response codes {', '.join(invalid)}")
+        return valid
+
+    @property
+    def status_codes(self):
+        return self.response_codes
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, self._parse_codes(value) if key == 'response_codes' else value)
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['response_codes'] = [str(code) for code in self.response_codes]
+        return data
+
+
+class ProbeResult(Record):
+    FIELDS = {
+        'url': None,
+        'method': None,
+        'status_code': None,
+        'headers': None,
+        'elapsed': None,
+        'matched': None,
+        'bytes_read': 0,
+        'truncated': False,
+        'timed_out': False,
+        'error': None,
+        'short_circuited': False,
+        'hedged': False,
+    }
+    __slots__ = tuple(FIELDS)
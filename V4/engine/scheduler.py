@@ -0,0 +1,60 @@
+import heapq
+import itertools
+import zlib
+
+
+# Deterministic start offset in [0, spread) for a key, so restarts spread the
+# same alerts over the same slots instead of firing everything at once.
+def jitter(key, spread):
+    return (zlib.crc32(str(key).encode('utf-8')) % 10000) / 10000 * spread
+
+
+# Min-heap of next-run times keyed by alert name. Rescheduling or cancelling a
+# key leaves its old heap entry behind; stale entries are skipped when popped.
+class Scheduler:
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, due):
+        seq = next(self._counter)
+        self._entries[key] = (due, seq)
+        heapq.heappush(self._heap, (due, seq, key))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(due, seq, key) for key, (due, seq) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key):
+        self._entries.pop(key, None)
+
+    def due_at(self, key):
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def _discard_stale(self):
+        while self._heap:
+            due, seq, key = self._heap[0]
+            if self._entries.get(key) == (due, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        ready = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return ready
+            due, seq, key = heapq.heappop(self._heap)
+            del self._entries[key]
+            ready.append((key, due))
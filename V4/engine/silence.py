@@ -0,0 +1,44 @@
+import logging
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+SILENCE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_silence_time(value):
+    return datetime.strptime(value, SILENCE_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+
+
+# Silence windows merged into sorted, non-overlapping intervals so "is this
+# instant silenced, and until when" is a binary search instead of a scan over
+# every configured period. Times are UTC epoch seconds.
+class SilenceIndex:
+    def __init__(self, windows=()):
+        merged = []
+        for start, end in sorted(w for w in windows if w[0] < w[1]):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+
+    def __len__(self):
+        return len(self._starts)
+
+    @classmethod
+    def from_periods(cls, periods):
+        windows = []
+        for period in periods:
+            try:
+                windows.append((parse_silence_time(period['start']), parse_silence_time(period['end'])))
+            except (KeyError, TypeError, ValueError) as e:
+                logging.error(f"Ignoring invalid silence period {period}: {e}")
+        return cls(windows)
+
+    # End of the window covering `now`, or None when nothing is silenced
+    def silenced_until(self, now):
+        i = bisect_right(self._starts, now) - 1
+        if i >= 0 and now < self._ends[i]:
+            return self._ends[i]
+        return None
@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+# Coalesces concurrent and recent calls for the same key. The first caller runs
+# the function; callers arriving while it is in flight wait for its result, and
+# callers within `freshness` seconds of completion get the cached result.
+class SingleFlight:
+    def __init__(self, freshness=30):
+        self.freshness = freshness
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def do(self, key, func):
+        with self._lock:
+            cached = self._results.get(key)
+            if cached and time.monotonic() - cached[0] < self.freshness:
+                self.hits += 1
+                return cached[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = func()
+        except Exception as e:
+            call['error'] = e
+        with self._lock:
+            del self._inflight[key]
+            if call['error'] is None:
+                self._results[key] = (time.monotonic(), call['result'])
+        call['done'].set()
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+    def forget(self, key):
+        with self._lock:
+            self._results.pop(key, None)
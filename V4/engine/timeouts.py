@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 10
+DEFAULT_TOTAL_TIMEOUT = 15
+
+
+class ProbeTimeout(Exception):
+    pass
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# Per-job timeout budgets. Explicit connect_timeout / read_timeout /
+# total_timeout fields on a job always win; otherwise, once a job has enough
+# successful samples, each deadline is a multiple of its recent p99 latency,
+# clamped between a floor and the static defaults.
+class TimeoutBudget:
+    def __init__(self, window=200, min_samples=20, multiplier=3, floor=0.5):
+        self.window = window
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.floor = floor
+        self._samples = {}
+        self._timeouts = {}
+        self._lock = threading.Lock()
+
+    def record(self, job_name, elapsed):
+        with self._lock:
+            self._samples.setdefault(job_name, deque(maxlen=self.window)).append(elapsed)
+
+    def record_timeout(self, job_name):
+        with self._lock:
+            self._timeouts[job_name] = self._timeouts.get(job_name, 0) + 1
+
+    def forget(self, job_name):
+        with self._lock:
+            self._samples.pop(job_name, None)
+            self._timeouts.pop(job_name, None)
+
+    def percentile(self, job_name, pct, min_samples=1):
+        with self._lock:
+            samples = list(self._samples.get(job_name, ()))
+        return _percentile(samples, pct) if len(samples) >= min_samples else None
+
+    def _learned(self, job_name, default):
+        with self._lock:
+            samples = list(self._samples.get(job_name, ()))
+        if len(samples) < self.min_samples:
+            return default
+        return min(default, max(self.floor, self.multiplier * _percentile(samples, 99)))
+
+    # Returns (connect, read, total) seconds for one probe of the job
+    def resolve(self, job_name, job):
+        connect = job.get('connect_timeout') or self._learned(job_name, DEFAULT_CONNECT_TIMEOUT)
+        read = job.get('read_timeout') or self._learned(job_name, DEFAULT_READ_TIMEOUT)
+        total = job.get('total_timeout') or max(connect + read, self._learned(job_name, DEFAULT_TOTAL_TIMEOUT))
+        return connect, read, total
+
+    def stats(self, job_name):
+        with self._lock:
+            samples = list(self._samples.get(job_name, ()))
+            timeouts = self._timeouts.get(job_name, 0)
+        return {
+            'samples': len(samples),
+            'p50': _percentile(samples, 50) if samples else None,
+            'p99': _percentile(samples, 99) if samples else None,
+            'timeouts': timeouts,
+        }
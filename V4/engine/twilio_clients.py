@@ -0,0 +1,67 @@
+import threading
+import time
+
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+
+# Twilio HTTP client that keeps its requests session (and so its connections)
+# between calls and records latency and error counts for its account.
+class _InstrumentedHttpClient(TwilioHttpClient):
+    def __init__(self, stats, lock, timeout=None):
+        super().__init__(pool_connections=True, timeout=timeout)
+        self._stats = stats
+        self._stats_lock = lock
+
+    def request(self, *args, **kwargs):
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = super().request(*args, **kwargs)
+            failed = response.status_code >= 400
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._stats['requests'] += 1
+                self._stats['errors'] += failed
+                self._stats['total_latency'] += elapsed
+                self._stats['max_latency'] = max(self._stats['max_latency'], elapsed)
+
+
+# One reusable Twilio client per twilio_accounts entry. A client is rebuilt
+# only when the account's SID or auth token changes.
+class TwilioClientRegistry:
+    def __init__(self, timeout=15):
+        self.timeout = timeout
+        self._clients = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, account_name, account_info):
+        credentials = (account_info['account_sid'], account_info['auth_token'])
+        with self._lock:
+            cached = self._clients.get(account_name)
+            if cached and cached[0] == credentials:
+                return cached[1]
+            stats = self._stats.setdefault(account_name, {
+                'requests': 0, 'errors': 0, 'total_latency': 0.0, 'max_latency': 0.0})
+            http_client = _InstrumentedHttpClient(stats, self._lock, self.timeout)
+            client = Client(*credentials, http_client=http_client)
+            self._clients[account_name] = (credentials, client)
+            return client
+
+    def forget(self, account_name):
+        with self._lock:
+            self._clients.pop(account_name, None)
+
+    def stats(self, account_name=None):
+        with self._lock:
+            names = [account_name] if account_name else list(self._stats)
+            report = {}
+            for name in names:
+                stats = dict(self._stats.get(name, {}))
+                if stats:
+                    stats['avg_latency'] = stats['total_latency'] / stats['requests'] if stats['requests'] else 0.0
+                    report[name] = stats
+            return report
@@ -1,50 +1,152 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import hashlib
 import json
 import logging
-import threading
-import time
 import requests
-from twilio.rest import Client
+import threading
+import uuid
+from twilio.base.exceptions import TwilioRestException
+from engine.adaptive import AdaptiveIntervals
+from engine.alert_registry import AlertRegistry
+from engine.alert_state import AlertStateMachine
+from engine.body_match import DEFAULT_MAX_BODY_BYTES
+from engine.circuit_breaker import CircuitBreakers, breaker_key
+from engine.config_snapshot import ConfigVersions
+from engine.config_store import ConfigStore, key_for
+from engine.config_watch import ConfigWatcher
+from engine.dependencies import DependencyGraph
+from engine.fanout import IncidentTracker, KeyedLimiter
+from engine.hedging import Hedger
+from engine.http_check import check_http
+from engine.http_pool import SessionManager
+from engine.incident_batch import IncidentBatcher
+from engine.notify_queue import Deferred, NotificationQueue
+from engine.probe_engine import ProbeEngine
+from engine.rate_limit import RateLimiter
+from engine.records import Alert, Job, TwilioAccount
+from engine.reachability import check_host, open_pinger
+from engine.silence import SilenceIndex, parse_silence_time
+from engine.single_flight import SingleFlight
+from engine.timeouts import ProbeTimeout, TimeoutBudget
+from engine.twilio_clients import TwilioClientRegistry
 
 # Logging setup
 logging.basicConfig(filename='app.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Global variables
+# Global variables. The UI edits these working copies, replacing records rather
+# than mutating them, and publishes each change to config_versions; probe and
+# delivery threads only ever read config_versions.current.
 twilio_accounts = {}
 monitoring_jobs = {}
-alerts = []
+alerts = AlertRegistry()  # Indexed by name, job_name and twilio_account
+config_versions = ConfigVersions()
+config_reload_pending = threading.Event()
 silence_periods = []
+probe_freshness = 30  # Seconds a job's probe result is shared between its alerts
+batch_window = 30  # Seconds notifications are collected into one summary per recipient
+dependent_slowdown = 4  # Dependents of a failing job are probed this many times less often
+hedge_budget = 0.05  # Extra HTTP probes allowed for hedging slow responses, as a share of all probes
+probe_budget = 10  # Probes per second across all alerts; adaptive intervals stretch to stay under it
+probe_concurrency = 64  # Probes running at once
+suppressed_alerts = {}  # Alert name -> the failing upstream job its failure was folded into
+config_store = ConfigStore('config.json', records={'twilio_accounts': TwilioAccount, 'monitoring_jobs': Job, 'alerts': Alert})
 
 # Load configuration from file
 def load_data():
-    global twilio_accounts, monitoring_jobs, alerts, silence_periods
+    global twilio_accounts, monitoring_jobs, silence_periods
     try:
-        with open('config.json', 'r') as f:
-            data = json.load(f)
-            twilio_accounts = data.get('twilio_accounts', {})
-            monitoring_jobs = data.get('monitoring_jobs', {})
-            alerts = data.get('alerts', [])
-            silence_periods = data.get('silence_periods', [])
+        data = config_store.load()
+        twilio_accounts = data['twilio_accounts']
+        monitoring_jobs = data['monitoring_jobs']
+        alerts.replace(data['alerts'])
+        silence_periods = data['silence_periods']
+        probe_engine.set_silences(SilenceIndex.from_periods(silence_periods))
+        publish_config()
+        # apply_config isn't subscribed yet at startup, so build the graph here
+        dependency_graph.build(config_versions.current.jobs)
         logging.info("Configuration loaded successfully.")
-    except FileNotFoundError:
-        logging.warning("Configuration file not found. Starting with empty configuration.")
     except json.JSONDecodeError as e:
         logging.error(f"Error decoding JSON from configuration file: {e}")
 
-# Save configuration to file
-def save_data():
-    global twilio_accounts, monitoring_jobs, alerts, silence_periods
-    data = {
-        'twilio_accounts': twilio_accounts,
-        'monitoring_jobs': monitoring_jobs,
-        'alerts': alerts,
-        'silence_periods': silence_periods
-    }
+# Re-read config.json after it was edited outside the GUI. The edited file wins:
+# GUI changes still only in the journal are dropped rather than replayed over it.
+# Records equal to the running ones are kept as they are, so publishing only
+# touches what changed.
+def reload_data():
+    global twilio_accounts, monitoring_jobs, silence_periods
+    try:
+        data = config_store.load(external=True)
+    except json.JSONDecodeError as e:
+        logging.error(f"Not reloading configuration, JSON is invalid: {e}")
+        return
+    twilio_accounts = keep_unchanged(twilio_accounts, data['twilio_accounts'])
+    monitoring_jobs = keep_unchanged(monitoring_jobs, data['monitoring_jobs'])
+    running = {alert['alert_name']: alert for alert in alerts}
+    alerts.replace(keep_unchanged(running, {alert['alert_name']: alert for alert in data['alerts']}).values())
+    if data['silence_periods'] != silence_periods:
+        silence_periods = data['silence_periods']
+        probe_engine.set_silences(SilenceIndex.from_periods(silence_periods))
+    publish_config()
+    update_twilio_account_options()
+    update_monitoring_job_options()
+    update_alert_list()
+    logging.info("Configuration reloaded from disk.")
+
+def keep_unchanged(current, loaded):
+    return {name: current[name] if current.get(name) == record else record for name, record in loaded.items()}
+
+# Called on the watcher thread; the reload itself runs on the Tk thread
+def on_config_file_changed(file_digest):
+    if file_digest != config_store.written_digest:  # Our own compactions need no reload
+        config_reload_pending.set()
+
+def check_config_reload():
+    if config_reload_pending.is_set():
+        config_reload_pending.clear()
+        reload_data()
+    root.after(500, check_config_reload)
+
+# `changed` names what a GUI edit touched, e.g. {'jobs': [job_name]}, so only
+# that is copied and diffed; leave it out after replacing the whole config
+def publish_config(changed=None):
+    config_versions.publish(twilio_accounts, monitoring_jobs, alerts, changed)
+
+# Apply the difference between two config versions; alerts and jobs that didn't
+# change keep running untouched
+def apply_config(old, new, changes):
+    account_changes = changes['accounts']
+    for account_name in account_changes['changed'] + account_changes['removed']:
+        twilio_clients.forget(account_name)
+
+    job_changes = changes['jobs']
+    for job_name in job_changes['changed'] + job_changes['removed']:
+        job_probes.forget(job_name)
+        timeout_budget.forget(job_name)
+    if any(job_changes.values()):
+        dependency_graph.build(new.jobs)
+
+    alert_changes = changes['alerts']
+    for alert_name in alert_changes['removed']:
+        probe_engine.remove(alert_name)
+        alert_states.reset(alert_name)
+        adaptive_intervals.forget(alert_name)
+        suppressed_alerts.pop(alert_name, None)
+    for alert_name in alert_changes['added'] + alert_changes['changed']:
+        alert = new.alerts.get(alert_name)
+        probe_engine.update(alert)
+        if not alert['monitoring']:
+            # Unscheduled alerts shouldn't keep a share of probe_budget
+            adaptive_intervals.forget(alert_name)
+    logging.info(f"Applied configuration version {new.version}: "
+                 + ', '.join(f"{section} +{len(c['added'])} ~{len(c['changed'])} -{len(c['removed'])}"
+                             for section, c in changes.items()))
+
+# Save one changed entry; config_store journals it and compacts config.json now and then
+def save_data(section, value, key=None):
     try:
-        with open('config.json', 'w') as f:
-            json.dump(data, f, indent=4)
-        logging.info("Configuration saved successfully.")
+        config_store.put(section, key if key is not None else key_for(section, value), value)
+        logging.info(f"Configuration saved: {section}.")
     except Exception as e:
         logging.error(f"Error saving configuration: {e}")
 
@@ -61,15 +163,16 @@ def add_twilio_account():
         messagebox.showerror("Error", "All fields are required.")
         return
 
-    twilio_accounts[account_name] = {
-        'account_sid': account_sid,
-        'auth_token': auth_token,
-        'twilio_number': twilio_number,
-        'recipient_numbers': recipient_numbers,
-        'methods': selected_methods
-    }
+    twilio_accounts[account_name] = TwilioAccount(
+        account_sid=account_sid,
+        auth_token=auth_token,
+        twilio_number=twilio_number,
+        recipient_numbers=recipient_numbers,
+        methods=selected_methods
+    )
 
-    save_data()
+    save_data('twilio_accounts', twilio_accounts[account_name], account_name)
+    publish_config({'accounts': [account_name]})
     update_twilio_account_options()
     logging.info(f"Added Twilio account: {account_name}")
     messagebox.showinfo("Success", "Twilio account added.")
@@ -88,19 +191,34 @@ def add_monitoring_job():
     url = url_entry.get()
     regex = regex_entry.get()
     proxy = proxy_entry.get()
+    max_body_kb = max_body_entry.get()
+    timeouts = timeouts_entry.get()
+    depends_on = [name.strip() for name in depends_on_entry.get().split(',') if name.strip()]
 
     if not (job_name and url):
         messagebox.showerror("Error", "Job Name and URL are required.")
         return
 
-    monitoring_jobs[job_name] = {
-        'url': url,
-        'url_type': url_type,
-        'regex': regex,
-        'proxy': proxy
-    }
-
-    save_data()
+    job = Job(
+        url=url,
+        url_type=url_type,
+        regex=regex,
+        proxy=proxy
+    )
+    if max_body_kb:
+        job['max_body_bytes'] = int(max_body_kb) * 1024
+    if timeouts:
+        for key, value in zip(('connect_timeout', 'read_timeout', 'total_timeout'), timeouts.split(',')):
+            if value.strip():
+                job[key] = float(value)
+    if depends_on:
+        job['depends_on'] = depends_on
+    if not follow_redirects_var.get():
+        job['follow_redirects'] = False
+    monitoring_jobs[job_name] = job
+
+    save_data('monitoring_jobs', job, job_name)
+    publish_config({'jobs': [job_name]})
     update_monitoring_job_options()
     logging.info(f"Added monitoring job: {job_name}")
     messagebox.showinfo("Success", "Monitoring job added.")
@@ -112,6 +230,38 @@ def update_monitoring_job_options():
     for job in jobs:
         menu.add_command(label=job, command=tk._setit(alert_url_var, job))
 
+def show_circuit_breakers():
+    lines = []
+    for key, breaker in sorted(host_breakers.stats().items()):
+        line = f"{key}: {breaker['state']}, {breaker['failures']} failures, {breaker['short_circuited']} short-circuited"
+        if breaker['next_sample_in'] is not None:
+            line += f", next sample in {breaker['next_sample_in']:.0f}s"
+        lines.append(line)
+    messagebox.showinfo("Circuit Breakers", "\n".join(lines) or "No hosts probed yet.")
+
+# Per Twilio account: notifications queued, sends waiting on the rate limiter,
+# current send rates and the account's Twilio API latency and errors
+def show_notification_queues():
+    queued = notifications.depth_by_account()
+    waiting = rate_limiter.waiting()
+    rates = rate_limiter.stats()
+    clients = twilio_clients.stats()
+    lines = []
+    for account_name in sorted(set(queued) | set(waiting) | set(clients) | {key.rsplit('/', 1)[0] for key in rates}):
+        line = f"{account_name}: {queued.get(account_name, 0)} queued, {waiting.get(account_name, 0)} rate limited"
+        for channel in RATE_LIMITED_CHANNELS.values():
+            rate = rates.get(f"{account_name}/{channel}")
+            if rate:
+                line += f", {channel} {rate['rate']:.2f}/{rate['configured_rate']:.2f} per s"
+                if rate['paused_for']:
+                    line += f" (paused {rate['paused_for']:.0f}s)"
+        client = clients.get(account_name)
+        if client:
+            line += (f", Twilio {client['requests']} requests, {client['errors']} errors, "
+                     f"{client['avg_latency'] * 1000:.0f} ms avg")
+        lines.append(line)
+    messagebox.showinfo("Notification Queues", "\n".join(lines) or "No notifications sent yet.")
+
 # Add an alert
 def add_alert():
     alert_name = alert_name_entry.get()
@@ -119,23 +269,39 @@ def add_alert():
     twilio_account = alert_twilio_account_var.get()
     scrape_interval = int(alert_interval_entry.get()) * 60
     response_codes = alert_response_codes_entry.get().split(',')
+    fail_threshold = alert_fail_threshold_entry.get()
+    renotify_minutes = alert_renotify_entry.get()
+    adaptive_minutes = alert_adaptive_entry.get()
 
     if not (alert_name and job_name and twilio_account):
         messagebox.showerror("Error", "Alert Name, Job Name, and Twilio Account are required.")
         return
+    invalid_codes = Alert.invalid_codes(response_codes)
+    if invalid_codes:
+        messagebox.showerror("Error", f"Invalid response codes: {', '.join(invalid_codes)}. "
+                                      "Use HTTP status numbers such as 200,301.")
+        return
 
-    alert = {
-        'alert_name': alert_name,
-        'job_name': job_name,
-        'twilio_account': twilio_account,
-        'scrape_interval': scrape_interval,
-        'response_codes': response_codes,
-        'monitoring': True
-    }
-    alerts.append(alert)
-    threading.Thread(target=monitor_alert, args=(alert,)).start()
-
-    save_data()
+    alert = Alert(
+        alert_name=alert_name,
+        job_name=job_name,
+        twilio_account=twilio_account,
+        scrape_interval=scrape_interval,
+        response_codes=response_codes,
+        send_recovery=alert_recovery_var.get(),
+        monitoring=True
+    )
+    if fail_threshold:
+        alert['fail_threshold'] = int(fail_threshold)
+    if renotify_minutes:
+        alert['renotify_interval'] = int(renotify_minutes) * 60
+    if adaptive_minutes:
+        min_minutes, max_minutes = adaptive_minutes.split(',')
+        alert['min_interval'] = float(min_minutes) * 60
+        alert['max_interval'] = float(max_minutes) * 60
+    alerts.add(alert)
+    save_data('alerts', alert)
+    publish_config({'alerts': [alert_name]})
     update_alert_list()
     logging.info(f"Added alert and started monitoring: {alert_name}")
     messagebox.showinfo("Success", "Alert added and monitoring started.")
@@ -152,74 +318,224 @@ def update_alert_list():
         tk.Button(alert_frame_inner, text="Pause", command=lambda a=alert['alert_name']: pause_monitoring(a)).pack(side='left', padx=5)
         tk.Button(alert_frame_inner, text="Stop", command=lambda a=alert['alert_name']: stop_monitoring(a)).pack(side='left', padx=5)
 
-# Function to monitor alerts
+# Fetch a job's URL; alerts sharing the job reuse one result via job_probes, and
+# jobs on a host that keeps failing share its breaker's cached "down" result.
+# HTTP probes slower than the job's p95 get a hedged second request. The job's
+# health in the dependency graph is set here, once per probe, rather than from
+# each alert's own response_codes.
+def probe_job(job_name, job):
+    connect_timeout, read_timeout, total_timeout = timeout_budget.resolve(job_name, job)
+    if job.get('url_type') == 'intranet':
+        check = lambda: check_host(pinger, job['url'], connect_timeout, job.get('port'))
+    else:
+        hedge_after = timeout_budget.percentile(job_name, 95, timeout_budget.min_samples)
+        http = lambda: check_http(http_sessions, job['url'], job.get('regex'), job.get('proxy', ''),
+                                  job.get('max_body_bytes') or DEFAULT_MAX_BODY_BYTES,
+                                  timeout=(connect_timeout, read_timeout), total_timeout=total_timeout,
+                                  allow_redirects=job.get('follow_redirects', True))
+        check = lambda: hedger.run(job_name, http, hedge_after)
+    result = host_breakers.call(breaker_key(job['url'], job.get('proxy', '')), check)
+    healthy = not (result['error'] or result['timed_out'])
+    if dependency_graph.mark(job_name, healthy) and healthy:
+        recheck_dependents(job_name)
+    if result.get('short_circuited'):
+        return result
+    if result['timed_out']:
+        timeout_budget.record_timeout(job_name)
+    elif not result['error']:
+        timeout_budget.record(job_name, result['elapsed'])
+    return result
+
+# Probe an alert once; scheduling between scrapes is handled by the probe engine.
+# While a job this one depends on is failing, its failures are folded into the
+# upstream incident instead of alerting, and it is probed less often.
 def monitor_alert(alert):
-    url = monitoring_jobs[alert['job_name']]['url']
-    scrape_interval = alert['scrape_interval']
-    account_info = twilio_accounts[alert['twilio_account']]
-    client = Client(account_info['account_sid'], account_info['auth_token'])
-
-    while alert['monitoring']:
-        try:
-            response = requests.get(url, proxies={"http": monitoring_jobs[alert['job_name']].get('proxy', ''),
-                                                 "https": monitoring_jobs[alert['job_name']].get('proxy', '')})
-            if response.status_code not in [int(code) for code in alert['response_codes']]:
-                raise requests.HTTPError(f"Unexpected response code: {response.status_code}")
-            logging.info(f"Monitoring {alert['alert_name']}: URL {url} is reachable.")
-        except Exception as e:
-            logging.error(f"Monitoring {alert['alert_name']} failed: {e}")
-            send_alert(alert, client, account_info)
-
-        time.sleep(scrape_interval)
-
-def send_alert(alert, client, account_info):
-    message = "Alert: URL is not reachable!"
+    config = config_versions.current
+    job = config.jobs.get(alert['job_name'])
+    if job is None:
+        logging.error(f"Monitoring {alert['alert_name']}: job {alert['job_name']} no longer exists.")
+        return
+    url = job['url']
+    elapsed = None
+
+    try:
+        result = job_probes.do(alert['job_name'], lambda: probe_job(alert['job_name'], job))
+        elapsed = result['elapsed']
+        if result['timed_out']:
+            raise ProbeTimeout(f"Probe timed out: {result['error']}")
+        if result['error']:
+            raise result['error']
+        if job.get('url_type') != 'intranet' and result['status_code'] not in alert.status_codes:
+            raise requests.HTTPError(f"Unexpected response code: {result['status_code']}")
+        if result['matched'] is False:
+            raise ValueError(f"Regex {job['regex']} did not match in {result['bytes_read']} bytes")
+        logging.info(f"Monitoring {alert['alert_name']}: URL {url} is reachable.")
+        ok = True
+    except Exception as e:
+        outcome = 'timed out' if isinstance(e, ProbeTimeout) else 'failed'
+        logging.error(f"Monitoring {alert['alert_name']} {outcome}: {e}")
+        ok = False
+
+    # Paused or removed while the probe ran; don't put it back into probe_budget
+    current = config_versions.current.alerts.get(alert['alert_name'])
+    if current is None or not current['monitoring']:
+        return None
+
+    # None keeps the fixed scrape_interval; adaptive alerts get their next interval
+    delay = adaptive_intervals.next_interval(alert, ok, elapsed)
+    upstream = dependency_graph.failing_upstream(alert['job_name'])
+    if upstream and not ok:
+        suppressed_alerts[alert['alert_name']] = upstream
+        logging.info(f"Alert {alert['alert_name']} suppressed: upstream job {upstream} is failing.")
+        return (delay or alert['scrape_interval']) * dependent_slowdown
+    suppressed_alerts.pop(alert['alert_name'], None)
+
+    # Notify only on state transitions (and periodic reminders), not on every failed probe
+    action = alert_states.observe(alert, ok)
+    if action in ('fire', 'renotify'):
+        logging.info(f"Alert {alert['alert_name']} {action}: {alert_states.state(alert['alert_name'])['state']}")
+        send_alert(alert, config.accounts[alert['twilio_account']], action)
+    elif action == 'resolve':
+        logging.info(f"Alert {alert['alert_name']} resolved.")
+        if alert.get('send_recovery', True):
+            send_alert(alert, config.accounts[alert['twilio_account']], action)
+    if upstream:
+        return (delay or alert['scrape_interval']) * dependent_slowdown
+    return delay
+
+# An upstream job recovered; probe its dependents now instead of at their slowed pace.
+# Their cached results are from while the upstream was down, so drop them first or
+# the recheck would replay that failure, now unsuppressed, as a fresh one.
+def recheck_dependents(job_name):
+    for dependent in dependency_graph.dependents(job_name):
+        job_probes.forget(dependent)
+        for alert in config_versions.current.alerts.by_job(dependent):
+            if alert['monitoring']:
+                probe_engine.reschedule(alert['alert_name'])
+
+alert_states = AlertStateMachine()
+http_sessions = SessionManager()
+pinger = open_pinger()
+job_probes = SingleFlight(probe_freshness)
+timeout_budget = TimeoutBudget()
+adaptive_intervals = AdaptiveIntervals(max_probes_per_second=probe_budget)
+host_breakers = CircuitBreakers(threshold=3, sample_interval=60)
+hedger = Hedger(budget=hedge_budget, max_concurrency=probe_concurrency)
+dependency_graph = DependencyGraph()
+probe_engine = ProbeEngine(monitor_alert, max_concurrency=probe_concurrency)
+
+# Hand the alert to the batcher; each recipient gets one summary per batch window.
+# Dependents whose alerts were suppressed are counted against the upstream job.
+def send_alert(alert, account_info, kind='fire'):
+    job_label = alert['job_name']
+    suppressed = sum(1 for upstream in list(suppressed_alerts.values()) if upstream == alert['job_name'])
+    if suppressed:
+        job_label += f" (+{suppressed} dependent)"
     for method in account_info['methods']:
+        method = method.lower()
+        if kind == 'resolve' and method == 'call':
+            continue  # Nobody needs a phone call to hear that things are fine again
         for number in account_info['recipient_numbers']:
-            try:
-                if method == 'call':
-                    client.calls.create(
-                        to=number,
-                        from_=account_info['twilio_number'],
-                        url='http://demo.twilio.com/docs/voice.xml'
-                    )
-                elif method == 'sms':
-                    client.messages.create(
-                        to=number,
-                        from_=account_info['twilio_number'],
-                        body=message
-                    )
-                elif method == 'email':
-                    # Assuming you have a function to send emails
-                    send_email(number, message)
-            except Exception as e:
-                logging.error(f"Failed to send {method} alert to {number}: {e}")
+            alert_batcher.add(alert['twilio_account'], method, number, kind, job_label)
+
+# Queue one summary per recipient; the notification workers fan them out in parallel
+def queue_batches(batches):
+    detected_at = min(batch['detected_at'] for batch in batches)
+    # Several batches can flush within one second, and the queue outlives restarts, so add a random suffix
+    incident_id = f"batch@{int(detected_at)}-{uuid.uuid4().hex[:12]}"
+    incidents.start(incident_id, detected_at)
+    queued = 0
+    for batch in batches:
+        # Keyed on the recipient and message, not the incident, so the same summary
+        # still waiting for the same recipient isn't queued twice
+        message_hash = hashlib.sha256(batch['message'].encode()).hexdigest()[:16]
+        dedupe_key = f"{batch['account']}:{batch['method']}:{batch['to']}:{message_hash}"
+        queued += notifications.enqueue(dedupe_key, {
+            'account': batch['account'],
+            'incident': incident_id,
+            'method': batch['method'],
+            'to': batch['to'],
+            'message': batch['message']
+        })
+    incidents.expect(incident_id, queued)
+
+# Deliver one queued notification; raising makes the queue retry it with backoff
+def deliver_notification(notification):
+    account_info = config_versions.current.accounts[notification['account']]
+    client = twilio_clients.get(notification['account'], account_info)
+    account_name = notification['account']
+    method = notification['method']
+    number = notification['to']
+    channel = RATE_LIMITED_CHANNELS.get(method)
+    if channel:
+        wait = rate_limiter.acquire(account_name, channel, account_info)
+        if wait:
+            raise Deferred(wait, f"{account_name} {channel} rate limited")
+    try:
+        with account_limits.hold(account_name):
+            send_notification(client, account_info, method, number, notification['message'])
+    except TwilioRestException as e:
+        if e.status == 429 and channel:
+            rate_limiter.throttled(account_name, channel, account_info)
+            logging.warning(f"Twilio throttled {account_name} {channel}; backing off")
+            raise Deferred(1, f"{account_name} {channel} throttled by Twilio")
+        raise
+    if channel:
+        rate_limiter.succeeded(account_name, channel, account_info)
+    logging.info(f"Sent {method} alert to {number}")
+
+def send_notification(client, account_info, method, number, message):
+    if method == 'call':
+        client.calls.create(
+            to=number,
+            from_=account_info['twilio_number'],
+            url='http://demo.twilio.com/docs/voice.xml'
+        )
+    elif method == 'sms':
+        client.messages.create(
+            to=number,
+            from_=account_info['twilio_number'],
+            body=message
+        )
+    elif method == 'email':
+        # Assuming you have a function to send emails
+        send_email(number, message)
+
+twilio_clients = TwilioClientRegistry()
+account_limits = KeyedLimiter(limit=4)  # Concurrent Twilio requests per account
+rate_limiter = RateLimiter()
+RATE_LIMITED_CHANNELS = {'call': 'calls', 'sms': 'messages'}
+incidents = IncidentTracker()
+alert_batcher = IncidentBatcher(queue_batches, window=batch_window, max_length=320)
+notifications = NotificationQueue(deliver_notification, workers=16,
+                                  on_done=lambda n, error: incidents.finished(n.get('incident'), error is None))
 
 def send_email(to_address, message):
     # Implement your email sending logic here
     pass
 
+# Published alerts are never mutated; each toggle publishes a new copy
+def set_monitoring(alert_name, monitoring):
+    alert = alerts.get(alert_name)
+    if alert is None:
+        return False
+    alerts.add(alert.copy(monitoring=monitoring))
+    save_data('alerts', alerts.get(alert_name))
+    publish_config({'alerts': [alert_name]})
+    return True
+
 def start_monitoring(alert_name):
-    for alert in alerts:
-        if alert['alert_name'] == alert_name:
-            alert['monitoring'] = True
-            logging.info(f"Started monitoring for alert: {alert_name}")
-            threading.Thread(target=monitor_alert, args=(alert,)).start()
-            break
+    if set_monitoring(alert_name, True):
+        logging.info(f"Started monitoring for alert: {alert_name}")
 
 def pause_monitoring(alert_name):
-    for alert in alerts:
-        if alert['alert_name'] == alert_name:
-            alert['monitoring'] = False
-            logging.info(f"Paused monitoring for alert: {alert_name}")
-            break
+    if set_monitoring(alert_name, False):
+        logging.info(f"Paused monitoring for alert: {alert_name}")
 
 def stop_monitoring(alert_name):
-    for alert in alerts:
-        if alert['alert_name'] == alert_name:
-            alert['monitoring'] = False
-            logging.info(f"Stopped monitoring for alert: {alert_name}")
-            break
+    if set_monitoring(alert_name, False):
+        alert_states.reset(alert_name)
+        logging.info(f"Stopped monitoring for alert: {alert_name}")
 
 # Set silence period
 def set_silence_period():
@@ -227,13 +543,22 @@ def set_silence_period():
     end = silence_end_entry.get()
     reason = silence_reason_entry.get()
 
+    try:
+        if parse_silence_time(start) >= parse_silence_time(end):
+            messagebox.showerror("Error", "End time must be after start time.")
+            return
+    except ValueError:
+        messagebox.showerror("Error", "Invalid date/time format. Use YYYY-MM-DD HH:MM:SS (UTC).")
+        return
+
     try:
         silence_periods.append({
             'start': start,
             'end': end,
             'reason': reason
         })
-        save_data()
+        probe_engine.set_silences(SilenceIndex.from_periods(silence_periods))
+        save_data('silence_periods', silence_periods[-1])
         logging.info(f"Silence period set from {start} to {end}. Reason: {reason}")
         messagebox.showinfo("Success", "Silence period set.")
     except Exception as e:
@@ -299,6 +624,7 @@ tk.Label(monitoring_tab, text="URL Type").grid(row=2, column=0, padx=5, pady=5)
 url_type_var = tk.StringVar(value="text")
 tk.Radiobutton(monitoring_tab, text="Text", variable=url_type_var, value="text").grid(row=2, column=1, padx=5, pady=5)
 tk.Radiobutton(monitoring_tab, text="JSON", variable=url_type_var, value="json").grid(row=2, column=2, padx=5, pady=5)
+tk.Radiobutton(monitoring_tab, text="Intranet", variable=url_type_var, value="intranet").grid(row=2, column=3, padx=5, pady=5)
 
 tk.Label(monitoring_tab, text="Regex (optional)").grid(row=3, column=0, padx=5, pady=5)
 regex_entry = tk.Entry(monitoring_tab)
@@ -307,8 +633,24 @@ regex_entry.grid(row=3, column=1, padx=5, pady=5)
 tk.Label(monitoring_tab, text="Proxy (optional)").grid(row=4, column=0, padx=5, pady=5)
 proxy_entry = tk.Entry(monitoring_tab)
 proxy_entry.grid(row=4, column=1, padx=5, pady=5)
+follow_redirects_var = tk.BooleanVar(value=True)
+tk.Checkbutton(monitoring_tab, text="Follow Redirects", variable=follow_redirects_var).grid(row=4, column=2, padx=5, pady=5)
 
-tk.Button(monitoring_tab, text="Add Monitoring Job", command=add_monitoring_job).grid(row=5, column=0, columnspan=2, pady=10)
+tk.Label(monitoring_tab, text="Max Body Size KB (optional)").grid(row=5, column=0, padx=5, pady=5)
+max_body_entry = tk.Entry(monitoring_tab)
+max_body_entry.grid(row=5, column=1, padx=5, pady=5)
+
+tk.Label(monitoring_tab, text="Timeouts s: connect,read,total (optional)").grid(row=6, column=0, padx=5, pady=5)
+timeouts_entry = tk.Entry(monitoring_tab)
+timeouts_entry.grid(row=6, column=1, padx=5, pady=5)
+
+tk.Label(monitoring_tab, text="Depends On: job names, comma-separated (optional)").grid(row=7, column=0, padx=5, pady=5)
+depends_on_entry = tk.Entry(monitoring_tab)
+depends_on_entry.grid(row=7, column=1, padx=5, pady=5)
+
+tk.Button(monitoring_tab, text="Add Monitoring Job", command=add_monitoring_job).grid(row=8, column=0, columnspan=2, pady=10)
+tk.Button(monitoring_tab, text="Show Circuit Breakers", command=show_circuit_breakers).grid(row=9, column=0, columnspan=2, pady=5)
+tk.Button(monitoring_tab, text="Show Notification Queues", command=show_notification_queues).grid(row=10, column=0, columnspan=2, pady=5)
 
 # Alerts Tab
 alerts_tab = ttk.Frame(notebook)
@@ -335,21 +677,36 @@ tk.Label(alerts_tab, text="Scrape Interval (minutes)").pack(pady=5)
 alert_interval_entry = tk.Entry(alerts_tab)
 alert_interval_entry.pack(pady=5)
 
+tk.Label(alerts_tab, text="Adaptive Interval min,max (minutes, optional)").pack(pady=5)
+alert_adaptive_entry = tk.Entry(alerts_tab)
+alert_adaptive_entry.pack(pady=5)
+
 tk.Label(alerts_tab, text="Response Codes (comma-separated)").pack(pady=5)
 alert_response_codes_entry = tk.Entry(alerts_tab)
 alert_response_codes_entry.pack(pady=5)
 
+tk.Label(alerts_tab, text="Failures Before Alerting (default 2)").pack(pady=5)
+alert_fail_threshold_entry = tk.Entry(alerts_tab)
+alert_fail_threshold_entry.pack(pady=5)
+
+tk.Label(alerts_tab, text="Re-notify Interval (minutes, default 60, 0 = never)").pack(pady=5)
+alert_renotify_entry = tk.Entry(alerts_tab)
+alert_renotify_entry.pack(pady=5)
+
+alert_recovery_var = tk.BooleanVar(value=True)
+tk.Checkbutton(alerts_tab, text="Send Recovery Message", variable=alert_recovery_var).pack(pady=5)
+
 tk.Button(alerts_tab, text="Add Alert", command=add_alert).pack(pady=10)
 
 # Silence Period Tab
 silence_tab = ttk.Frame(notebook)
 notebook.add(silence_tab, text="Silence Period")
 
-tk.Label(silence_tab, text="Start Time").grid(row=0, column=0, padx=5, pady=5)
+tk.Label(silence_tab, text="Start Time (UTC, YYYY-MM-DD HH:MM:SS)").grid(row=0, column=0, padx=5, pady=5)
 silence_start_entry = tk.Entry(silence_tab)
 silence_start_entry.grid(row=0, column=1, padx=5, pady=5)
 
-tk.Label(silence_tab, text="End Time").grid(row=1, column=0, padx=5, pady=5)
+tk.Label(silence_tab, text="End Time (UTC, YYYY-MM-DD HH:MM:SS)").grid(row=1, column=0, padx=5, pady=5)
 silence_end_entry = tk.Entry(silence_tab)
 silence_end_entry.grid(row=1, column=1, padx=5, pady=5)
 
@@ -359,9 +716,21 @@ silence_reason_entry.grid(row=2, column=1, padx=5, pady=5)
 
 tk.Button(silence_tab, text="Set Silence Period", command=set_silence_period).grid(row=3, column=0, columnspan=2, pady=10)
 
-# Initial Data Load
+# Initial Data Load; alerts only start when asked, so subscribe after loading
 load_data()
+config_versions.subscribe(apply_config)
 update_twilio_account_options()
 update_monitoring_job_options()
+notifications.start()
+config_watcher = ConfigWatcher('config.json', on_config_file_changed, debounce=0.5)
+config_watcher.start()
+root.after(500, check_config_reload)
 
 root.mainloop()
+config_watcher.stop()
+probe_engine.shutdown()
+alert_batcher.flush()
+notifications.stop()
+hedger.close()
+http_sessions.close()
+config_store.close()